@@ -1,5 +1,7 @@
 import streamlit as st
 from database import cursor
+from matching import get_score_cache
+from wait_queue import percentiles
 
 def admin_page():
     st.title("Admin Dashboard")
@@ -25,6 +27,24 @@ def admin_page():
     c2.metric("Students", students)
     c3.metric("Teachers", teachers)
 
+    cache = get_score_cache().stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Score Cache Hit Rate", f"{cache['hit_rate']:.0%}" if cache["maxsize"] else "off")
+    c2.metric("Cached Pairs", f"{cache['size']:,} / {cache['maxsize']:,}")
+    c3.metric("Evictions", f"{cache['evictions']:,}")
+
+    # Time to match for users currently in a session (minutes)
+    cursor.execute("""
+        SELECT (julianday(matched_at) - julianday(COALESCE(waiting_since, created_at))) * 1440
+        FROM profiles
+        WHERE status='matched' AND matched_at IS NOT NULL
+    """)
+    waits = percentiles([max(0.0, r[0]) for r in cursor.fetchall()])
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Time to Match p50", f"{waits[50]:.1f} min")
+    c2.metric("Time to Match p90", f"{waits[90]:.1f} min")
+    c3.metric("Time to Match p99", f"{waits[99]:.1f} min")
+
     st.divider()
 
     # =================================================
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from groq import Groq
 from supabase import create_client, Client
+from subject_masks import SUBJECTS, LANGUAGES, TIME_SLOTS
 import time
 from datetime import datetime, timedelta
 
@@ -188,15 +189,15 @@ if st.session_state.stage == 1:
                 role = st.radio("I want to:", ["Learn (Student)", "Teach (Mentor)"], horizontal=True)
                 role_str = "Student" if "Learn" in role else "Teacher"
                 name = st.text_input("My Full Name", placeholder="e.g. Rahul Sharma")
-                languages = st.multiselect("Languages I speak", ["English", "Hindi", "Marathi", "Tamil", "Bengali", "Telugu"])
+                languages = st.multiselect("Languages I speak", LANGUAGES)
             with col2:
                 grade = st.selectbox("Current Grade", [f"Grade {i}" for i in range(1, 13)])
-                time_slot = st.selectbox("Preferred Time", ["4-5 PM", "5-6 PM", "6-7 PM"])
+                time_slot = st.selectbox("Preferred Time", TIME_SLOTS)
             
             st.divider()
             c1, c2 = st.columns(2)
             with c1:
-                subjects = st.multiselect("Subjects", ["Mathematics", "Science", "English", "History", "Physics", "Chemistry"])
+                subjects = st.multiselect("Subjects", SUBJECTS)
             with c2:
                 topics = st.text_input("Specific Topic Focus", placeholder="e.g. Algebra, Thermodynamics, Grammar")
 
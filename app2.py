@@ -1,4 +1,5 @@
 import streamlit as st
+from shared_pool import get_shared_pool
 from ratings import show_rating_ui
 from matching import find_matches
 import time
@@ -14,12 +15,6 @@ if "stage" not in st.session_state:
 if "profile" not in st.session_state:
     st.session_state.profile = {}
 
-if "mentors" not in st.session_state:
-    st.session_state.mentors = []
-
-if "mentees" not in st.session_state:
-    st.session_state.mentees = []
-
 if "leaderboard" not in st.session_state:
     st.session_state.leaderboard = {}
 
@@ -72,22 +67,12 @@ def calculate_match_score(mentee, mentor):
     return score, reasons
 
 def find_best_mentor(mentee, mentors):
-    mentee_name = mentee["name"]
-    eligible_mentors = [m for m in mentors if m["name"] != mentee_name]
+    best_mentor, best_score = mentors.best(mentee, exclude_name=mentee["name"])
     
-    if not eligible_mentors:
+    if best_mentor is None:
         return None, 0, []
     
-    best_mentor = None
-    best_score = -1
-    best_reasons = []
-    
-    for mentor in eligible_mentors:
-        score, reasons = calculate_match_score(mentee, mentor)
-        if score > best_score:
-            best_score = score
-            best_mentor = mentor
-            best_reasons = reasons
+    best_reasons = calculate_match_score(mentee, best_mentor)[1]
     
     return best_mentor, best_score, best_reasons if best_score >= 15 else (None, 0, [])
 
@@ -163,13 +148,10 @@ if st.session_state.stage == 1:
             if role == "Student":
                 profile["strong_subjects"] = strong_subjects
                 profile["weak_subjects"] = weak_subjects
-                if strong_subjects:
-                    st.session_state.mentors.append(profile)
-                if weak_subjects:
-                    st.session_state.mentees.append(profile)
+                get_shared_pool().register(profile, mentor=bool(strong_subjects), mentee=bool(weak_subjects))
             else:
                 profile["teaches"] = teaches
-                st.session_state.mentors.append(profile)
+                get_shared_pool().register(profile, mentor=True)
 
             st.session_state.profile = profile
             st.success("Profile created successfully!")
@@ -186,7 +168,7 @@ if st.session_state.stage == 2:
 
     with st.spinner("Analyzing profiles for best match..."):
         time.sleep(1)
-        best_mentor, score, reasons = find_best_mentor(current_mentee, st.session_state.mentors)
+        best_mentor, score, reasons = find_best_mentor(current_mentee, get_shared_pool().mentor_pool())
 
     # Debug info (collapsible)
     with st.expander("View Match Analysis"):
@@ -196,7 +178,7 @@ if st.session_state.stage == 2:
         st.write(f"- Grade: {current_mentee['grade']}, Time: {current_mentee['time']}")
         
         st.write("**All available mentors & scores**:")
-        for mentor in st.session_state.mentors:
+        for mentor in get_shared_pool().mentors():
             if mentor["name"] != current_mentee["name"]:
                 m_score, m_reasons = calculate_match_score(current_mentee, mentor)
                 st.write(f"{mentor['name']} ({mentor['role']}): **{m_score}** pts - {m_reasons}")
@@ -224,6 +206,7 @@ if st.session_state.stage == 2:
         st.info("Match reasons: " + "; ".join(reasons))
         
         if st.button("Start Learning Session", type="primary"):
+            get_shared_pool().remove(best_mentor["name"], st.session_state.profile["name"])
             st.session_state.stage = 3
             st.rerun()
     else:
@@ -298,6 +281,7 @@ if st.session_state.stage == 4:
             st.write(f"{i}. {name}: {score} points")
 
     if st.button("New Session"):
+        get_shared_pool().remove(st.session_state.profile["name"])
         for key in list(st.session_state.keys()):
             if key not in ["leaderboard"]:
                 del st.session_state[key]
@@ -1,4 +1,5 @@
 import streamlit as st
+from shared_pool import get_shared_pool
 import time
 from materials import materials_page
 from ratings import show_rating_ui
@@ -30,12 +31,6 @@ if "stage" not in st.session_state:
 if "profile" not in st.session_state:
     st.session_state.profile = {}
 
-if "mentors" not in st.session_state:
-    st.session_state.mentors = []
-
-if "mentees" not in st.session_state:
-    st.session_state.mentees = []
-
 if "leaderboard" not in st.session_state:
     st.session_state.leaderboard = {}
 
@@ -88,15 +83,8 @@ def calculate_match_score(mentee, mentor):
     return score, reasons
 
 def find_best_mentor(mentee, mentors):
-    eligible = [m for m in mentors if m["name"] != mentee["name"]]
-    best_mentor, best_score, best_reasons = None, -1, []
-
-    for mentor in eligible:
-        score, reasons = calculate_match_score(mentee, mentor)
-        if score > best_score:
-            best_mentor = mentor
-            best_score = score
-            best_reasons = reasons
+    best_mentor, best_score = mentors.best(mentee, exclude_name=mentee["name"])
+    best_reasons = calculate_match_score(mentee, best_mentor)[1] if best_mentor else []
 
     return best_mentor, best_score, best_reasons if best_score >= 15 else (None, 0, [])
 
@@ -165,13 +153,10 @@ if page == "Matchmaking":
                 if role == "Student":
                     profile["strong_subjects"] = strong_subjects
                     profile["weak_subjects"] = weak_subjects
-                    if strong_subjects:
-                        st.session_state.mentors.append(profile)
-                    if weak_subjects:
-                        st.session_state.mentees.append(profile)
+                    get_shared_pool().register(profile, mentor=bool(strong_subjects), mentee=bool(weak_subjects))
                 else:
                     profile["teaches"] = teaches
-                    st.session_state.mentors.append(profile)
+                    get_shared_pool().register(profile, mentor=True)
 
                 st.session_state.profile = profile
                 st.session_state.stage = 2
@@ -187,7 +172,7 @@ if page == "Matchmaking":
             time.sleep(1)
             best_mentor, score, reasons = find_best_mentor(
                 st.session_state.profile,
-                st.session_state.mentors
+                get_shared_pool().mentor_pool()
             )
 
         if best_mentor:
@@ -205,6 +190,7 @@ if page == "Matchmaking":
             st.info("Reasons: " + "; ".join(reasons))
 
             if st.button("Start Learning Session", type="primary"):
+                get_shared_pool().remove(best_mentor["name"], st.session_state.profile["name"])
                 st.session_state.stage = 3
                 st.rerun()
         else:
@@ -272,6 +258,7 @@ if page == "Matchmaking":
             st.write(f"{i}. {name} - {score} points")
 
         if st.button("New Session"):
+            get_shared_pool().remove(st.session_state.profile["name"])
             for key in list(st.session_state.keys()):
                 if key != "leaderboard":
                     del st.session_state[key]
@@ -1,4 +1,5 @@
 import streamlit as st
+from shared_pool import get_shared_pool
 import time
 
 # ---- IMPORT PAGES ----
@@ -37,12 +38,6 @@ if "profile" not in st.session_state:
 if "user_profile" not in st.session_state:
     st.session_state.user_profile = {}
 
-if "mentors" not in st.session_state:
-    st.session_state.mentors = []
-
-if "mentees" not in st.session_state:
-    st.session_state.mentees = []
-
 if "leaderboard" not in st.session_state:
     st.session_state.leaderboard = {}
 
@@ -95,18 +90,10 @@ def calculate_match_score(mentee, mentor):
     return score, reasons
 
 def find_best_mentor(mentee, mentors):
-    eligible = [m for m in mentors if m["name"] != mentee["name"]]
-    best_mentor, best_score, best_reasons = None, -1, []
-
-    for mentor in eligible:
-        score, reasons = calculate_match_score(mentee, mentor)
-        if score > best_score:
-            best_mentor = mentor
-            best_score = score
-            best_reasons = reasons
+    best_mentor, best_score = mentors.best(mentee, exclude_name=mentee["name"])
 
     if best_score >= 15:
-        return best_mentor, best_score, best_reasons
+        return best_mentor, best_score, calculate_match_score(mentee, best_mentor)[1]
     return None, 0, []
 
 # =========================================================
@@ -166,13 +153,10 @@ if page == "Matchmaking":
                 if role == "Student":
                     profile["strong_subjects"] = strong_subjects
                     profile["weak_subjects"] = weak_subjects
-                    if strong_subjects:
-                        st.session_state.mentors.append(profile)
-                    if weak_subjects:
-                        st.session_state.mentees.append(profile)
+                    get_shared_pool().register(profile, mentor=bool(strong_subjects), mentee=bool(weak_subjects))
                 else:
                     profile["teaches"] = teaches
-                    st.session_state.mentors.append(profile)
+                    get_shared_pool().register(profile, mentor=True)
 
                 st.session_state.profile = profile
                 st.session_state.user_profile = profile  # PRACTICE PAGE USES THIS
@@ -189,7 +173,7 @@ if page == "Matchmaking":
             time.sleep(1)
             mentor, score, reasons = find_best_mentor(
                 st.session_state.profile,
-                st.session_state.mentors
+                get_shared_pool().mentor_pool()
             )
 
         if mentor:
@@ -203,6 +187,7 @@ if page == "Matchmaking":
             }
 
             if st.button("Start Learning Session", type="primary"):
+                get_shared_pool().remove(mentor["name"], st.session_state.profile["name"])
                 st.session_state.stage = 3
                 st.rerun()
         else:
@@ -253,6 +238,7 @@ if page == "Matchmaking":
             st.write(f"{i}. {name} - {score} points")
 
         if st.button("New Session"):
+            get_shared_pool().remove(st.session_state.profile["name"])
             for key in list(st.session_state.keys()):
                 if key != "leaderboard":
                     del st.session_state[key]
@@ -10,6 +10,9 @@ from dashboard import dashboard_page
 
 # ---- DATABASE ----
 from database import init_db, cursor, conn
+from mentor_stats import record_rating
+from profile_cache import VersionedCache
+from scoring_kernel import CompiledPool
 
 # =========================================================
 # INIT DATABASE
@@ -86,42 +89,43 @@ if st.sidebar.button("Logout", key="logout_btn"):
 # =========================================================
 # DATABASE LOADERS
 # =========================================================
-def load_users():
+def load_mentors():
+    """Only the rows and columns find_best_mentor reads."""
     cursor.execute("""
         SELECT 
             a.name,
+            p.user_id,
             p.role,
             p.grade,
-            p.class,
             p.time,
             p.strong_subjects,
-            p.weak_subjects,
             p.teaches
         FROM profiles p
         JOIN auth_users a ON a.id = p.user_id
+        WHERE p.role = 'Teacher' OR COALESCE(p.strong_subjects, '') != ''
     """)
     rows = cursor.fetchall()
 
-    mentors, mentees = [], []
-
-    for r in rows:
-        user = {
+    return [
+        {
             "name": r[0],
-            "role": r[1],
-            "grade": r[2],
-            "class": r[3],
+            "user_id": r[1],
+            "role": r[2],
+            "grade": r[3],
             "time": r[4],
             "strong_subjects": r[5].split(",") if r[5] else [],
-            "weak_subjects": r[6].split(",") if r[6] else [],
-            "teaches": r[7].split(",") if r[7] else []
+            "teaches": r[6].split(",") if r[6] else []
         }
+        for r in rows
+    ]
 
-        if user["role"] == "Teacher" or user["strong_subjects"]:
-            mentors.append(user)
-        if user["weak_subjects"]:
-            mentees.append(user)
-
-    return mentors, mentees
+@st.cache_resource
+def get_mentor_cache():
+    """
+    Mentors shared by all sessions, compiled for the scoring kernel and
+    reloaded only after profiles change.
+    """
+    return VersionedCache(lambda: CompiledPool("app6", load_mentors()))
 
 # =========================================================
 # MATCHING LOGIC
@@ -147,16 +151,11 @@ def calculate_match_score(mentee, mentor):
 
 
 def find_best_mentor(mentee, mentors):
-    best, best_score, best_reasons = None, -1, []
-
-    for mentor in mentors:
-        if mentor["name"] == mentee["name"]:
-            continue
-        score, reasons = calculate_match_score(mentee, mentor)
-        if score > best_score:
-            best, best_score, best_reasons = mentor, score, reasons
-
-    return (best, best_score, best_reasons) if best_score >= 15 else (None, 0, [])
+    """`mentors` is a scoring_kernel.CompiledPool; reasons are built for the winner only."""
+    best, best_score = mentors.best(mentee, exclude_name=mentee["name"])
+    if best_score < 15:
+        return None, 0, []
+    return best, best_score, calculate_match_score(mentee, best)[1]
 
 # =========================================================
 # PAGE ROUTING
@@ -174,7 +173,6 @@ if page == "Dashboard":
 elif page == "Matchmaking":
 
     st.title("Sahay - Peer Learning Matchmaking System")
-    mentors, mentees = load_users()
 
     # -------------------------
     # PROFILE CREATION
@@ -234,7 +232,7 @@ elif page == "Matchmaking":
             **st.session_state.profile
         }
 
-        mentor, score, reasons = find_best_mentor(mentee, mentors)
+        mentor, score, reasons = find_best_mentor(mentee, get_mentor_cache().get())
 
         if mentor:
             st.success(f"Matched with {mentor['name']} (Score {score})")
@@ -242,6 +240,7 @@ elif page == "Matchmaking":
 
             st.session_state.current_match = {
                 "mentor": mentor["name"],
+                "mentor_id": mentor["user_id"],
                 "mentee": mentee["name"]
             }
 
@@ -270,14 +269,16 @@ elif page == "Matchmaking":
 
         if st.button("Submit Rating"):
             cursor.execute("""
-                INSERT INTO ratings (mentor, mentee, rating, session_date)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO ratings (mentor, mentor_id, mentee, rating, session_date)
+                VALUES (?, ?, ?, ?, ?)
             """, (
                 st.session_state.current_match["mentor"],
+                st.session_state.current_match["mentor_id"],
                 st.session_state.current_match["mentee"],
                 rating,
                 date.today()
             ))
+            record_rating(st.session_state.current_match["mentor_id"], rating)
             conn.commit()
 
             st.success("Rating saved")
@@ -0,0 +1,51 @@
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+# =========================================================
+# BACKGROUND LOOP
+# =========================================================
+class BackgroundLoop:
+    """
+    Calls run_once() on a daemon thread every `interval` seconds until
+    stop(). With run_at_start the first call is immediate, otherwise it
+    comes one interval in. A failing run is logged and kept in last_error;
+    the loop carries on. Used by ttl_sweeper.TTLSweeper and
+    storage.Checkpointer.
+    """
+
+    run_at_start = False
+
+    def __init__(self, interval, name):
+        self.interval = interval
+        self.name = name
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def _loop(self):
+        if not self.run_at_start and self._stop.wait(self.interval):
+            return
+        while True:
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                log.exception("%s failed", self.name)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
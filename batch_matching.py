@@ -0,0 +1,188 @@
+import multiprocessing
+import time
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from database import transaction
+from matching import load_profiles, MATCH_THRESHOLD
+from batch_scoring import pool_arrays, score_rows, iter_score_blocks
+from wait_queue import AgingQueue, AGING_POINTS_PER_MIN, waiting_since
+
+# Candidate edges kept per user before the greedy pass
+TOP_K = 16
+# Grades per band when sharding (1-3, 4-6, 7-9, 10-12)
+GRADE_BAND = 3
+# Below this pool size the shards are paired in-process
+PARALLEL_MIN_POOL = 2000
+
+# =========================================================
+# BATCH PAIRING
+# =========================================================
+# Greedy max-weight matching over each user's top-k edges, then a
+# local-improvement pass that swaps a pair (a, b) for (a, x) + (b, y)
+# with free users x, y whenever that raises the total weight. Greedy is
+# at least half of the optimum; the swaps recover most of the rest and
+# turn single pairs into two sessions when the pool allows it.
+def candidate_edges(pool, threshold, top_k=TOP_K):
+    """(i, j, w) arrays with i < j, sorted by weight desc then index."""
+    n = len(pool["user_id"])
+    k = min(top_k, n - 1)
+    if k < 1:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    ii, jj, ww = [], [], []
+    for start, block in iter_score_blocks(pool):
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        w = np.take_along_axis(block, top, axis=1).ravel()
+        i = np.repeat(np.arange(start, start + len(block)), k)
+        keep = w >= threshold
+        ii.append(i[keep]); jj.append(top.ravel()[keep]); ww.append(w[keep])
+
+    i, j, w = np.concatenate(ii), np.concatenate(jj), np.concatenate(ww).astype(np.int64)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    _, first = np.unique(i * n + j, return_index=True)
+    i, j, w = i[first], j[first], w[first]
+    order = np.lexsort((j, i, -w))
+    return i[order], j[order], w[order]
+
+def _best_two(row, free):
+    row = np.where(free, row, -1)
+    if len(row) < 2:
+        return [(int(row.argmax()), int(row.max()))] if len(row) else []
+    top = np.argpartition(-row, 1)[:2]
+    return sorted(((int(t), int(row[t])) for t in top), key=lambda x: -x[1])
+
+def _improve(pool, mate, weight, threshold):
+    free = mate < 0
+    for a in np.flatnonzero(mate >= 0):
+        b = mate[a]
+        if b < a or b < 0:
+            continue
+        rows = score_rows(pool, [a, b])
+        best = None
+        for x, wx in _best_two(rows[0], free):
+            for y, wy in _best_two(rows[1], free):
+                if x == y or wx < threshold or wy < threshold:
+                    continue
+                if wx + wy > weight[a] and (best is None or wx + wy > best[2] + best[3]):
+                    best = (x, y, wx, wy)
+        if best:
+            x, y, wx, wy = best
+            mate[a], mate[x], mate[b], mate[y] = x, a, y, b
+            weight[a] = weight[x] = wx
+            weight[b] = weight[y] = wy
+            free[x] = free[y] = False
+
+def pair_pool(users, threshold=MATCH_THRESHOLD, top_k=TOP_K):
+    """
+    Pair the waiting pool for maximum total score. Returns a list of
+    (user_a, user_b, score) with every score >= threshold.
+    """
+    if len(users) < 2:
+        return []
+    pool = pool_arrays(users)
+    n = len(users)
+    mate = np.full(n, -1, dtype=np.int64)
+    weight = np.zeros(n, dtype=np.int64)
+
+    for i, j, w in zip(*(a.tolist() for a in candidate_edges(pool, threshold, top_k))):
+        if mate[i] < 0 and mate[j] < 0:
+            mate[i], mate[j] = j, i
+            weight[i] = weight[j] = w
+
+    _improve(pool, mate, weight, threshold)
+
+    ids = pool["user_id"]
+    return [(ids[a].item(), ids[b].item(), int(weight[a]))
+            for a, b in enumerate(mate.tolist()) if b > a]
+
+# =========================================================
+# PARTITIONED PAIRING
+# =========================================================
+# Same-slot pairs get the time bonus and same-grade pairs sit in the same
+# band, so most good pairs live inside one (time slot, grade band) shard.
+# Shards are paired in parallel processes, then everyone left over is
+# paired once more across shards so cross-shard matches are not lost.
+# Workers are spawned, not forked: by now the process has SQLite handles
+# open and background threads running (database.start_checkpointer).
+def grade_band(grade):
+    try:
+        return (int(str(grade).split()[-1]) - 1) // GRADE_BAND
+    except (ValueError, IndexError):
+        return -1
+
+def partition_pool(users):
+    shards = defaultdict(list)
+    for u in users:
+        shards[(u["time"], grade_band(u["grade"]))].append(u)
+    return shards
+
+def pair_partitioned(users, threshold=MATCH_THRESHOLD, max_workers=None):
+    shards = list(partition_pool(users).values())
+    if len(users) >= PARALLEL_MIN_POOL and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as ex:
+            results = list(ex.map(pair_pool, shards, repeat(threshold)))
+    else:
+        results = [pair_pool(shard, threshold) for shard in shards]
+
+    pairs = [p for r in results for p in r]
+    paired = {uid for a, b, _ in pairs for uid in (a, b)}
+    pairs += pair_pool([u for u in users if u["user_id"] not in paired], threshold)
+    return pairs
+
+# =========================================================
+# WAIT-AWARE PAIRING
+# =========================================================
+# Serves the pool in aging-priority order instead of by best total score:
+# the longest waiting user takes the free partner with the highest
+# score + wait boost (raw score must still reach the threshold). Users
+# nobody can help are skipped, so they don't block the queue.
+def pair_by_wait(users, threshold=MATCH_THRESHOLD, now=None):
+    """Same (user_a, user_b, score) output as pair_pool, longest waiting served first."""
+    if len(users) < 2:
+        return []
+    if now is None: now = time.time()
+    pool = pool_arrays(users)
+    since = np.array([waiting_since(u, now) for u in users], dtype=np.float64)
+    boost = AGING_POINTS_PER_MIN * np.maximum(0.0, now - since) / 60
+
+    queue = AgingQueue()
+    for i, s in enumerate(since.tolist()):
+        queue.push(i, s)
+    free = np.ones(len(users), dtype=bool)
+    ids, pairs = pool["user_id"], []
+    while len(queue) > 1:
+        i = queue.pop()
+        free[i] = False
+        row = score_rows(pool, [i])[0]
+        ok = free & (row >= threshold)
+        if not ok.any():
+            continue
+        j = int(np.argmax(np.where(ok, row + boost, -np.inf)))
+        free[j] = False
+        queue.remove(j)
+        pairs.append((ids[i].item(), ids[j].item(), int(row[j])))
+    return pairs
+
+def write_proposals(pairs, group_rows=()):
+    """
+    Replace the open proposals with `pairs` (and group_matching.group_proposals
+    rows) in a single transaction.
+    """
+    with transaction() as cur:
+        cur.execute("DELETE FROM match_proposals")
+        cur.executemany(
+            "INSERT INTO match_proposals (match_id, user_a, user_b, score) VALUES (?, ?, ?, ?)",
+            [(f"{a}-{b}", a, b, s) for a, b, s in pairs] + list(group_rows)
+        )
+
+def run_batch(threshold=MATCH_THRESHOLD, partitioned=False, aging=False):
+    users = load_profiles()
+    if aging: pairs = pair_by_wait(users, threshold)
+    elif partitioned: pairs = pair_partitioned(users, threshold)
+    else: pairs = pair_pool(users, threshold)
+    write_proposals(pairs)
+    return pairs
@@ -0,0 +1,65 @@
+import numpy as np
+from subject_masks import SUBJECT_BITS
+
+# =========================================================
+# VECTORIZED SCORING (same weights as matching.score)
+# =========================================================
+SUBJECT_WEIGHT = 25
+GRADE_WEIGHT = 10
+TIME_WEIGHT = 10
+N_SUBJECTS = len(SUBJECT_BITS)
+
+def _codes(values):
+    lookup = {}
+    return np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=len(values))
+
+def one_hot(masks):
+    """N bitmasks -> N x N_SUBJECTS float32 matrix (float so the products hit BLAS)."""
+    masks = np.asarray(masks, dtype=np.int64)
+    return ((masks[:, None] >> np.arange(N_SUBJECTS)) & 1).astype(np.float32)
+
+def pool_arrays(users):
+    """Column arrays for a waiting pool as returned by matching.load_profiles()."""
+    return {
+        "user_id": np.array([u["user_id"] for u in users]),
+        "strong": one_hot([u["strong_mask"] for u in users]),
+        "weak": one_hot([u["weak_mask"] for u in users]),
+        "grade": _codes([u["grade"] for u in users]),
+        "time": _codes([u["time"] for u in users]),
+    }
+
+def score_rows(pool, rows):
+    """
+    Scores of the query users `rows` (indices or slice into the pool) against
+    the whole pool, as a len(rows) x N int16 matrix. Self-pairs score 0.
+    """
+    strong, weak = pool["strong"], pool["weak"]
+    comp = weak[rows] @ strong.T + strong[rows] @ weak.T
+    out = (comp * SUBJECT_WEIGHT).astype(np.int16)
+    out += (pool["grade"][rows][:, None] == pool["grade"][None, :]) * np.int16(GRADE_WEIGHT)
+    out += (pool["time"][rows][:, None] == pool["time"][None, :]) * np.int16(TIME_WEIGHT)
+
+    idx = np.arange(len(strong))[rows]
+    out[np.arange(len(idx)), idx] = 0
+    return out
+
+def score_matrix(pool):
+    """Full N x N compatibility matrix."""
+    return score_rows(pool, slice(None))
+
+def iter_score_blocks(pool, block=2048):
+    """Yield (start, block of rows) so large pools never hold N x N in memory."""
+    n = len(pool["user_id"])
+    for start in range(0, n, block):
+        yield start, score_rows(pool, slice(start, min(start + block, n)))
+
+def best_rows(pool, rows, threshold):
+    """
+    Best partner index and score per query row, -1 where nothing reaches
+    `threshold`. argmax keeps the first maximum, like matching.find_best.
+    """
+    scores = score_rows(pool, rows)
+    best = scores.argmax(axis=1)
+    best_s = scores[np.arange(len(best)), best]
+    best[best_s < threshold] = -1
+    return best, np.where(best >= 0, best_s, 0)
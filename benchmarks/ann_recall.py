@@ -0,0 +1,64 @@
+"""
+Recall and speed of the LSH candidate index (ann_index.AnnIndex) against
+the exact full scan, both re-ranked with matching.find_best.
+
+    python -m benchmarks.ann_recall --sizes 10000,100000 --queries 200
+
+recall@1 counts a query as found when the ANN best score equals the brute
+force best score (ties between equally good partners are not misses);
+queries with no partner above MATCH_THRESHOLD are skipped. The ANN_*
+defaults come from this run; ann_index.py records the figures.
+"""
+import argparse
+import random
+import time
+
+from matching import find_best
+from ann_index import AnnIndex, ANN_TABLES, ANN_BITS, ANN_PROBES
+from benchmarks.synthetic import generate_profiles
+
+def run(n, n_queries, seed, tables, bits, probes):
+    users = generate_profiles(n, seed)
+    queries = random.Random(seed).sample(users, min(n_queries, n))
+
+    start = time.perf_counter()
+    index = AnnIndex(tables, bits, probes)
+    index.rebuild(users)
+    build = time.perf_counter() - start
+
+    hits = total = scanned = 0
+    exact_t = ann_t = 0.0
+    for me in queries:
+        t0 = time.perf_counter()
+        _, exact = find_best(me, users)
+        t1 = time.perf_counter()
+        candidates = index.candidates(me)
+        _, approx = find_best(me, candidates)
+        t2 = time.perf_counter()
+        exact_t += t1 - t0
+        ann_t += t2 - t1
+        scanned += len(candidates)
+        if exact:
+            total += 1
+            hits += approx == exact
+
+    print(f"n={n:>9,}  tables={tables} bits={bits} probes={probes}  build={build:6.2f}s  "
+          f"recall@1={hits / total if total else 1.0:6.3f}  "
+          f"scanned={scanned / len(queries) / n:6.1%}  "
+          f"exact={exact_t / len(queries) * 1e3:8.2f}ms  ann={ann_t / len(queries) * 1e3:8.2f}ms  "
+          f"speedup={exact_t / ann_t if ann_t else 0:5.1f}x", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ann_recall")
+    parser.add_argument("--sizes", default="10000,100000", help="comma separated pool sizes")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tables", type=int, default=ANN_TABLES)
+    parser.add_argument("--bits", type=int, default=ANN_BITS)
+    parser.add_argument("--probes", type=int, default=ANN_PROBES)
+    args = parser.parse_args(argv)
+    for n in (int(s) for s in args.sizes.split(",") if s):
+        run(n, args.queries, args.seed, args.tables, args.bits, args.probes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Mixed chat read/write load against SQLite's default storage settings and
+the storage.py profile (WAL, synchronous=NORMAL, mmap, cache, temp_store).
+
+--readers threads poll a random chat the way matching.load_msgs does and
+--writers threads post to one the way send_msg does (INSERT + commit),
+each thread on its own connection as database.pool gives it. Each profile
+runs on a fresh copy of the same seeded database; the tuned run keeps a
+storage.Checkpointer going and reports the WAL size it ended with.
+
+    python -m benchmarks.chat_storage [--readers 40] [--writers 10] [--seconds 5]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from storage import configure, Checkpointer
+
+MATCHES = 2000
+MESSAGES_PER_MATCH = 20
+
+def seed_db(path, seed=0):
+    db = sqlite3.connect(path)
+    db.execute("""
+        CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, match_id TEXT,
+                               sender TEXT, message TEXT, created_at TEXT DEFAULT (datetime('now')))
+    """)
+    rng = random.Random(seed)
+    db.executemany("INSERT INTO messages (match_id, sender, message) VALUES (?, ?, ?)",
+                   [(f"m{m}", f"user{m}", "x" * rng.randint(10, 200))
+                    for m in range(MATCHES) for _ in range(MESSAGES_PER_MATCH)])
+    db.execute("CREATE INDEX idx_messages_match ON messages (match_id)")
+    db.commit()
+    db.close()
+
+def open_db(path, profile):
+    db = sqlite3.connect(path, check_same_thread=False)
+    return configure(db) if profile == "tuned" else db
+
+def run(profile, path, readers, writers, seconds, checkpoint_interval, max_wal_bytes):
+    checkpointer = None
+    if profile == "tuned":
+        open_db(path, profile).close()  # switch the file to WAL before the clock starts
+        checkpointer = Checkpointer(lambda: open_db(path, profile), path,
+                                    interval=checkpoint_interval, max_wal_bytes=max_wal_bytes,
+                                    name="bench-checkpointer").start()
+
+    stop = time.perf_counter() + seconds
+    lat = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    out_lock = threading.Lock()
+
+    def client(n, kind):
+        db = open_db(path, profile)
+        rng = random.Random(n)
+        mine, failed = [], 0
+        while time.perf_counter() < stop:
+            mid = f"m{rng.randrange(MATCHES)}"
+            start = time.perf_counter()
+            try:
+                if kind == "read":
+                    db.execute("SELECT sender, message FROM messages WHERE match_id=? ORDER BY id", (mid,)).fetchall()
+                else:
+                    db.execute("INSERT INTO messages (match_id, sender, message) VALUES (?, ?, ?)",
+                               (mid, f"user{n}", "x" * rng.randint(10, 200)))
+                    db.commit()
+            except sqlite3.OperationalError:
+                failed += 1
+                if db.in_transaction: db.rollback()
+            mine.append(time.perf_counter() - start)
+        db.close()
+        with out_lock:
+            lat[kind].extend(mine)
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=client, args=(n, "read")) for n in range(readers)]
+    threads += [threading.Thread(target=client, args=(n, "write")) for n in range(readers, readers + writers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    result = {"wal_mib": 0.0}
+    if checkpointer:
+        checkpointer.stop()
+        result["wal_mib"] = checkpointer.wal_bytes() / 2**20
+    for kind in ("read", "write"):
+        ms = np.array(lat[kind] or [0.0]) * 1000
+        result[kind] = {"per_s": len(lat[kind]) / seconds, "p50_ms": float(np.percentile(ms, 50)),
+                        "p99_ms": float(np.percentile(ms, 99)), "errors": errors[kind]}
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.chat_storage")
+    parser.add_argument("--readers", type=int, default=40)
+    parser.add_argument("--writers", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--checkpoint-interval", type=float, default=1.0)
+    parser.add_argument("--max-wal-mib", type=float, default=8, help="WAL size that forces a truncating checkpoint")
+    parser.add_argument("--dir", help="where to put the test databases (default: a temp dir); "
+                                      "use the disk app.db lives on, fsync cost is the point")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        seed = os.path.join(tmp, "seed.db")
+        seed_db(seed)
+        print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile")
+        print(f"{'profile':<8} {'reads/s':>8} {'p50':>8} {'p99':>9} {'writes/s':>9} {'p50':>8} {'p99':>9} "
+              f"{'errors':>7} {'WAL':>8}")
+        for profile in ("default", "tuned"):
+            path = os.path.join(tmp, f"{profile}.db")
+            shutil.copy(seed, path)
+            r = run(profile, path, args.readers, args.writers, args.seconds, args.checkpoint_interval,
+                    int(args.max_wal_mib * 2**20))
+            rd, wr = r["read"], r["write"]
+            print(f"{profile:<8} {rd['per_s']:8.0f} {rd['p50_ms']:6.2f}ms {rd['p99_ms']:7.2f}ms "
+                  f"{wr['per_s']:9.0f} {wr['p50_ms']:6.2f}ms {wr['p99_ms']:7.2f}ms "
+                  f"{rd['errors'] + wr['errors']:7d} {r['wal_mib']:6.1f}MiB", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Read throughput of the database layer under concurrent users.
+
+--users threads play Streamlit sessions against a seeded temporary
+database. Each session repeats page loads (one thread lease per script
+run) that read its own profile, its chat and a count like admin.py does,
+and checks every result belongs to the query it sent:
+
+    shared    one connection and one cursor for every thread, as
+              database.py had before the pool; results cross between
+              threads and it can crash the interpreter, so opt-in only
+    locked    the same, with every execute+fetch under one lock
+    pool      database.ConnectionPool, a connection and cursor per thread
+
+    python -m benchmarks.db_pool [--users 50] [--seconds 5] [--profiles 5000]
+    python -m benchmarks.db_pool --modes shared     # reproduce the old failure
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from database import ConnectionPool, POOL_SIZE, connect
+from benchmarks.synthetic import generate_profiles
+
+MESSAGES_PER_MATCH = 40
+
+def seed_db(path, n_profiles, seed=0):
+    db = connect(path)
+    db.executescript("""
+        CREATE TABLE auth_users (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE profiles (user_id INTEGER UNIQUE, role TEXT, grade TEXT, time TEXT,
+                               status TEXT, match_id TEXT);
+        CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, match_id TEXT,
+                               sender TEXT, message TEXT);
+    """)
+    users = generate_profiles(n_profiles, seed)
+    db.executemany("INSERT INTO auth_users (id, name) VALUES (?, ?)",
+                   [(u["user_id"], u["name"]) for u in users])
+    db.executemany("INSERT INTO profiles VALUES (?, ?, ?, ?, 'matched', ?)",
+                   [(u["user_id"], u["role"], u["grade"], u["time"], f"m{(u['user_id'] - 1) // 2}")
+                    for u in users])
+    rng = random.Random(seed)
+    db.executemany("INSERT INTO messages (match_id, sender, message) VALUES (?, ?, ?)",
+                   [(f"m{m}", f"user{m}", "x" * rng.randint(10, 200))
+                    for m in range(n_profiles // 2) for _ in range(MESSAGES_PER_MATCH)])
+    db.execute("CREATE INDEX idx_messages_match ON messages (match_id)")
+    db.commit()
+    db.close()
+    return [u["user_id"] for u in users]
+
+# =========================================================
+# ONE PAGE LOAD
+# =========================================================
+def page_load(cur, uid):
+    """Three reads a matchmaking page does; returns how many came back wrong."""
+    bad = 0
+    cur.execute("""
+        SELECT p.user_id, p.match_id FROM profiles p JOIN auth_users a ON a.id = p.user_id
+        WHERE p.user_id = ?
+    """, (uid,))
+    row = cur.fetchone()
+    bad += row is None or row[0] != uid
+    mid = f"m{(uid - 1) // 2}"
+    cur.execute("SELECT match_id, sender, message FROM messages WHERE match_id=? ORDER BY id", (mid,))
+    rows = cur.fetchall()
+    bad += len(rows) != MESSAGES_PER_MATCH or any(r[0] != mid for r in rows)
+    cur.execute("SELECT COUNT(*), 'count' FROM profiles WHERE role='Student'")
+    row = cur.fetchone()
+    bad += row is None or row[1] != "count"
+    return bad
+
+class _Locked:
+    """A cursor whose execute+fetch pairs run under one lock."""
+
+    def __init__(self, cur, lock):
+        self.cur, self.lock = cur, lock
+
+    def execute(self, *args):
+        self.lock.acquire()
+        self.cur.execute(*args)
+
+    def fetchone(self):
+        try: return self.cur.fetchone()
+        finally: self.lock.release()
+
+    def fetchall(self):
+        try: return self.cur.fetchall()
+        finally: self.lock.release()
+
+def run(mode, path, user_ids, n_users, seconds, pool_size):
+    if mode == "pool":
+        pool = ConnectionPool(path, size=pool_size)
+    else:
+        shared = connect(path)
+        shared_cur, lock = shared.cursor(), threading.Lock()
+
+    stop = time.perf_counter() + seconds
+    latencies, counts = [], {"loads": 0, "wrong": 0, "errors": 0}
+    out_lock = threading.Lock()
+
+    def session(n):
+        rng = random.Random(n)
+        lat, loads, wrong, errors = [], 0, 0, 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                if mode == "pool":
+                    wrong += page_load(pool.cursor(), rng.choice(user_ids))
+                    pool.release()  # the script run ends
+                elif mode == "locked":
+                    wrong += page_load(_Locked(shared_cur, lock), rng.choice(user_ids))
+                else:
+                    wrong += page_load(shared_cur, rng.choice(user_ids))
+            except sqlite3.Error:
+                errors += 1
+            lat.append(time.perf_counter() - start)
+            loads += 1
+        with out_lock:
+            latencies.extend(lat)
+            counts["loads"] += loads
+            counts["wrong"] += wrong
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(n_users)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    if mode != "pool": shared.close()
+
+    lat = np.array(latencies) * 1000
+    return {"loads_per_s": counts["loads"] / seconds, "reads_per_s": 3 * counts["loads"] / seconds,
+            "p50_ms": float(np.percentile(lat, 50)), "p99_ms": float(np.percentile(lat, 99)),
+            "wrong": counts["wrong"], "errors": counts["errors"],
+            "opened": pool.opened if mode == "pool" else 1}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.db_pool")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    parser.add_argument("--modes", default="locked,pool", help="comma separated: shared, locked, pool")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        user_ids = seed_db(path, args.profiles)
+        print(f"{args.users} users, {args.profiles} profiles, {args.seconds:g}s per mode")
+        print(f"{'mode':<8} {'reads/s':>9} {'p50':>8} {'p99':>9} {'wrong':>7} {'errors':>7} {'conns':>6}")
+        for mode in args.modes.split(","):
+            r = run(mode, path, user_ids, args.users, args.seconds, args.pool_size)
+            print(f"{mode:<8} {r['reads_per_s']:9.0f} {r['p50_ms']:6.2f}ms {r['p99_ms']:7.2f}ms "
+                  f"{r['wrong']:7d} {r['errors']:7d} {r['opened']:6d}", flush=True)
+
+if __name__ == "__main__":
+    main()
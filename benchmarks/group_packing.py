@@ -0,0 +1,48 @@
+"""
+Sessions served per Teacher: 1:1 pairing (batch_matching.pair_pool) vs
+group packing (group_matching.pack_groups) with the rest paired 1:1.
+
+    python -m benchmarks.group_packing --pool 5000 --group-size 4
+
+Reports, per mode, how many Teachers are busy, mentees they serve, mentees
+served per Teacher-hour (each session is one slot = one hour) and the mean
+mentee-Teacher score, plus everyone matched overall.
+"""
+import argparse
+import time
+
+from batch_matching import pair_pool
+from benchmarks.synthetic import generate_profiles
+from group_matching import pack_groups, GROUP_SIZE
+
+def report(name, users, groups, pairs, elapsed):
+    teachers = {u["user_id"] for u in users if u["role"] == "Teacher"}
+    led = [(t, [sc for _, sc in members]) for t, _, members in groups]
+    led += [(a if a in teachers else b, [s]) for a, b, s in pairs if (a in teachers) != (b in teachers)]
+    served = sum(len(scores) for _, scores in led)
+    scores = [sc for _, s in led for sc in s]
+    matched = served + len(led) + 2 * sum(1 for a, b, _ in pairs if a not in teachers and b not in teachers)
+    print(f"{name:<7} teachers busy={len(led):>5,}/{len(teachers):,}  mentees served={served:>6,}  "
+          f"per teacher-hour={served / len(led) if led else 0:4.2f}  "
+          f"mean score={sum(scores) / len(scores) if scores else 0:5.1f}  "
+          f"users matched={matched:>6,}/{len(users):,}  [{elapsed:.2f}s]")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.group_packing")
+    parser.add_argument("--pool", type=int, default=5000)
+    parser.add_argument("--group-size", type=int, default=GROUP_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    users = generate_profiles(args.pool, args.seed)
+
+    start = time.perf_counter()
+    report("1:1", users, [], pair_pool(users), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    groups = pack_groups(users, args.group_size)
+    grouped = {t for t, _, _ in groups} | {m for _, _, members in groups for m, _ in members}
+    pairs = pair_pool([u for u in users if u["user_id"] not in grouped])
+    report("groups", users, groups, pairs, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
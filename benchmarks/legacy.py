@@ -0,0 +1,32 @@
+"""
+Load scoring functions out of the Streamlit app scripts without running them.
+
+app.py, app6.py and sahay.py execute their whole UI (and connect to
+Supabase) at import time, so only the named top-level function
+definitions, plus whatever they use from other modules of this repo,
+are compiled into a fresh namespace.
+"""
+import ast
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_functions(script, *names):
+    path = os.path.join(ROOT, script)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    defs = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name in names]
+    missing = set(names) - {d.name for d in defs}
+    if missing:
+        raise LookupError(f"{script} has no function(s): {', '.join(sorted(missing))}")
+    used = {n.id for d in defs for n in ast.walk(d) if isinstance(n, ast.Name)}
+    local_imports = []
+    for n in tree.body:
+        if isinstance(n, ast.ImportFrom) and n.module and os.path.exists(os.path.join(ROOT, n.module + ".py")):
+            aliases = [a for a in n.names if (a.asname or a.name) in used]
+            if aliases:
+                local_imports.append(ast.ImportFrom(module=n.module, names=aliases, level=0))
+
+    ns = {}
+    exec(compile(ast.fix_missing_locations(ast.Module(body=local_imports + defs, type_ignores=[])), path, "exec"), ns)
+    return [ns[n] for n in names]
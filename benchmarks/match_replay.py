@@ -0,0 +1,169 @@
+"""
+Match replay simulator for tuning MATCH_THRESHOLD and the score weights.
+
+A stream of timestamped signups is replayed on a virtual clock through
+the online matching rule used by matchmaking_page: on arrival a user takes
+the best waiting partner (first on ties, like matching.find_best) if that
+scores at least the threshold, otherwise joins the pool; users still
+waiting after --patience minutes leave unmatched (the TTL sweeper's rule).
+
+    # synthetic: Poisson signups, profiles drawn from benchmarks.synthetic
+    python -m benchmarks.match_replay --rate 5 --hours 8 --runs 50 \\
+        --thresholds 20,30,40,50 --weights 25,10,10 --weights 25,5,15
+
+    # replay profiles.created_at from a copy of app.db (profiles bootstrapped per run)
+    python -m benchmarks.match_replay --db app.db --runs 50 --thresholds 30,40
+
+Each (threshold, weights) config is run --runs times with independent
+NumPy streams (Monte Carlo) and reported as the mean with a 5-95% band:
+matches per hour, wait to match (p50/p90/p99 minutes), unmatched rate
+(expired / users whose outcome is known) and mean match score.
+"""
+import argparse
+import json
+import sqlite3
+
+import numpy as np
+
+from batch_scoring import SUBJECT_WEIGHT, GRADE_WEIGHT, TIME_WEIGHT, N_SUBJECTS
+from matching import MATCH_THRESHOLD, profile_masks
+from benchmarks.synthetic import generate_profiles
+
+PATIENCE_MIN = 60
+# popcount lookup for subject masks
+POPCOUNT = np.array([bin(i).count("1") for i in range(1 << N_SUBJECTS)], dtype=np.int64)
+
+# =========================================================
+# SIGNUP STREAMS
+# =========================================================
+def profile_arrays(rows):
+    """rows of (strong_mask, weak_mask, grade, time) -> column arrays."""
+    codes = {}
+    def code(v): return codes.setdefault(v, len(codes))
+    return {
+        "strong": np.array([r[0] for r in rows], dtype=np.int64),
+        "weak": np.array([r[1] for r in rows], dtype=np.int64),
+        "grade": np.array([code(("g", r[2])) for r in rows], dtype=np.int64),
+        "time": np.array([code(("t", r[3])) for r in rows], dtype=np.int64),
+    }
+
+def synthetic_source(rate, hours, base_size=5000, seed=0):
+    base = profile_arrays([(u["strong_mask"], u["weak_mask"], u["grade"], u["time"])
+                           for u in generate_profiles(base_size, seed)])
+    horizon = hours * 60.0
+
+    def draw(rng):
+        times = np.sort(rng.uniform(0, horizon, rng.poisson(rate * horizon)))
+        idx = rng.integers(0, len(base["strong"]), len(times))
+        return times, {k: v[idx] for k, v in base.items()}
+    return draw, horizon
+
+def db_source(path):
+    db = sqlite3.connect(path)
+    rows = db.execute("""
+        SELECT strong_subjects, weak_subjects, teaches, strong_mask, weak_mask, teaches_mask,
+               grade, time, CAST(strftime('%s', created_at) AS INTEGER)
+        FROM profiles WHERE created_at IS NOT NULL ORDER BY created_at
+    """).fetchall()
+    db.close()
+    if not rows:
+        raise SystemExit(f"no profiles with created_at in {path}")
+    base = profile_arrays([(*profile_masks(*r[:6]), r[6], r[7]) for r in rows])
+    times = (np.array([r[8] for r in rows], dtype=np.float64) - rows[0][8]) / 60
+    horizon = max(float(times[-1]), 1.0)
+
+    def draw(rng):
+        # Keep the real signup times, bootstrap who signs up
+        idx = rng.integers(0, len(times), len(times))
+        return times, {k: v[idx] for k, v in base.items()}
+    return draw, horizon
+
+# =========================================================
+# REPLAY
+# =========================================================
+def simulate(times, p, threshold, weights, horizon, patience=PATIENCE_MIN):
+    ws, wg, wt = weights
+    n = len(times)
+    waiting = np.zeros(n, dtype=bool)
+    wait, scores, expired = [], [], 0
+    for i in range(n):
+        t = times[i]
+        stale = waiting & (times < t - patience)
+        expired += int(stale.sum())
+        waiting &= ~stale
+        cand = np.flatnonzero(waiting)
+        if len(cand):
+            s = ((POPCOUNT[p["weak"][i] & p["strong"][cand]] + POPCOUNT[p["strong"][i] & p["weak"][cand]]) * ws
+                 + (p["grade"][cand] == p["grade"][i]) * wg + (p["time"][cand] == p["time"][i]) * wt)
+            j = int(s.argmax())
+            if s[j] > 0 and s[j] >= threshold:
+                waiting[cand[j]] = False
+                wait += [t - times[cand[j]], 0.0]
+                scores.append(int(s[j]))
+                continue
+        waiting[i] = True
+
+    # Still waiting at the end: expired if out of patience, otherwise censored
+    expired += int((waiting & (times < horizon - patience)).sum())
+    known = 2 * len(scores) + expired
+    wait = np.array(wait) if wait else np.zeros(1)
+    return {
+        "matches_per_hour": len(scores) / (horizon / 60),
+        "wait_p50": float(np.percentile(wait, 50)),
+        "wait_p90": float(np.percentile(wait, 90)),
+        "wait_p99": float(np.percentile(wait, 99)),
+        "unmatched_rate": expired / known if known else 0.0,
+        "mean_score": float(np.mean(scores)) if scores else 0.0,
+    }
+
+def monte_carlo(draw, horizon, threshold, weights, runs, seed, patience):
+    # The same seeds for every config, so configs are compared on the same signups
+    results = [simulate(*draw(np.random.default_rng([seed, r])), threshold, weights, horizon, patience)
+               for r in range(runs)]
+    summary = {}
+    for key in results[0]:
+        values = np.array([r[key] for r in results])
+        summary[key] = {"mean": float(values.mean()),
+                        "p5": float(np.percentile(values, 5)), "p95": float(np.percentile(values, 95))}
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.match_replay")
+    parser.add_argument("--db", help="replay profiles.created_at from this SQLite file instead of synthetic signups")
+    parser.add_argument("--rate", type=float, default=5, help="synthetic signups per minute")
+    parser.add_argument("--hours", type=float, default=8, help="synthetic stream length")
+    parser.add_argument("--runs", type=int, default=50, help="Monte Carlo runs per config")
+    parser.add_argument("--thresholds", default=str(MATCH_THRESHOLD), help="comma separated MATCH_THRESHOLD values")
+    parser.add_argument("--weights", action="append",
+                        help="subject,grade,time weights; repeat to compare (default: the live weights)")
+    parser.add_argument("--patience", type=float, default=PATIENCE_MIN, help="minutes before a waiting user leaves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    draw, horizon = db_source(args.db) if args.db else synthetic_source(args.rate, args.hours, seed=args.seed)
+    thresholds = [int(t) for t in args.thresholds.split(",") if t]
+    weights = [tuple(int(w) for w in ws.split(",")) for ws in args.weights or []] \
+        or [(SUBJECT_WEIGHT, GRADE_WEIGHT, TIME_WEIGHT)]
+
+    results = []
+    print(f"{'weights':<10} {'thr':>4} {'matches/h':>16} {'wait p50':>9} {'p90':>7} {'p99':>7} "
+          f"{'unmatched':>17} {'score':>6}")
+    for w in weights:
+        for thr in thresholds:
+            s = monte_carlo(draw, horizon, thr, w, args.runs, args.seed, args.patience)
+            results.append({"threshold": thr, "weights": list(w), **s})
+            print(f"{','.join(map(str, w)):<10} {thr:>4} "
+                  f"{s['matches_per_hour']['mean']:7.1f} [{s['matches_per_hour']['p5']:5.0f}-{s['matches_per_hour']['p95']:<5.0f}]"
+                  f"{s['wait_p50']['mean']:7.1f}m {s['wait_p90']['mean']:6.1f}m {s['wait_p99']['mean']:6.1f}m "
+                  f"{s['unmatched_rate']['mean']:7.1%} [{s['unmatched_rate']['p5']:4.0%}-{s['unmatched_rate']['p95']:<4.0%}]"
+                  f"{s['mean_score']['mean']:6.1f}", flush=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"runs": args.runs, "horizon_min": horizon, "patience_min": args.patience,
+                       "source": args.db or "synthetic", "results": results}, f, indent=2)
+        print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Scalability benchmark for the matching scorers.
+
+For each pool size a seeded synthetic pool is generated and every scorer
+answers the same random match queries. Reported per scorer and size:
+p50/p99 latency per query, queries per second, pairs scored per second
+and peak memory allocated while answering (tracemalloc).
+
+    python -m benchmarks.matching_suite --sizes 100,1000,10000,100000,1000000 \
+        --queries 50 --out bench_matching.json
+
+Scorers:
+  matching.find_best           full scan over the waiting pool
+  matching.find_best[index]    scan over SubjectIndex candidates
+  app6.find_best_mentor        CompiledPool of the mentors, as app6.get_mentor_cache builds it
+  app.calculate_match_score    app.py has no find_best_mentor; this is the
+                               find_best_match loop over the rows its
+                               Supabase query returns (opposite role, same slot)
+  sahay.calculate_match_score  same loop with sahay.py's scorer
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from matching import find_best
+from match_index import SubjectIndex
+from scoring_kernel import CompiledPool
+from benchmarks.legacy import load_functions
+from benchmarks.synthetic import generate_profiles
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+MEMORY_QUERIES = 5
+
+def _scan(calculate):
+    def find(me, candidates):
+        best, high = None, 0
+        for p in candidates:
+            s = calculate(me, p)
+            if s > high: best, high = p, s
+        return best
+    return find
+
+def build_scorers(users):
+    """name -> (query fn, candidates for a query user) for one pool."""
+    index = SubjectIndex()
+    index.rebuild(users)
+
+    _, app6_best = load_functions("app6.py", "calculate_match_score", "find_best_mentor")
+    # app6 searches a CompiledPool (its get_mentor_cache); compiled once per pool, like the cache
+    mentors = CompiledPool("app6", [u for u in users if u["role"] == "Teacher" or u["strong_subjects"]])
+
+    by_role_slot = defaultdict(list)
+    for u in users:
+        by_role_slot[(u["role"], u["time_slot"])].append(u)
+
+    def supabase_rows(me):
+        opposite = "Teacher" if me["role"] == "Student" else "Student"
+        return by_role_slot[(opposite, me["time_slot"])]
+
+    app_find = _scan(*load_functions("app.py", "calculate_match_score"))
+    sahay_find = _scan(load_functions("sahay.py", "calculate_match_score", "profile_tokens", "parse_grade")[0])
+
+    return {
+        "matching.find_best": (find_best, lambda me: users),
+        "matching.find_best[index]": (find_best, index.candidates),
+        "app6.find_best_mentor": (app6_best, lambda me: mentors),
+        "app.calculate_match_score": (app_find, supabase_rows),
+        "sahay.calculate_match_score": (sahay_find, supabase_rows),
+    }
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def run_scorer(fn, candidates_for, queries):
+    latencies, pairs = [], 0
+    for me in queries:
+        start = time.perf_counter()
+        candidates = candidates_for(me)
+        fn(me, candidates)
+        latencies.append(time.perf_counter() - start)
+        pairs += len(candidates)
+
+    tracemalloc.start()
+    for me in queries[:MEMORY_QUERIES]:
+        fn(me, candidates_for(me))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+        "throughput_qps": len(latencies) / total if total else 0.0,
+        "pairs_per_s": pairs / total if total else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+def run(sizes, n_queries, seed, scorer_names=None):
+    results = []
+    for n in sizes:
+        users = generate_profiles(n, seed)
+        queries = random.Random(seed).sample(users, min(n_queries, n))
+        for name, (fn, candidates_for) in build_scorers(users).items():
+            if scorer_names and name not in scorer_names:
+                continue
+            row = {"scorer": name, "pool_size": n, **run_scorer(fn, candidates_for, queries)}
+            results.append(row)
+            print(f"{name:<28} n={n:>9,}  p50={row['p50_ms']:9.3f}ms  p99={row['p99_ms']:9.3f}ms  "
+                  f"{row['throughput_qps']:10.1f} q/s  peak={row['peak_kib']:8.1f}KiB", flush=True)
+        del users, queries
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.matching_suite")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated pool sizes")
+    parser.add_argument("--queries", type=int, default=50, help="match queries per scorer and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scorers", default="", help="comma separated subset of scorer names")
+    parser.add_argument("--out", default="bench_matching.json", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    scorers = [s for s in args.scorers.split(",") if s]
+    results = run(sizes, args.queries, args.seed, scorers)
+
+    with open(args.out, "w") as f:
+        json.dump({
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": args.seed,
+                "queries": args.queries,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
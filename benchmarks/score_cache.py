@@ -0,0 +1,57 @@
+"""
+Repeated searches against an almost unchanged pool, with and without the
+pair-score cache (score_cache.PairScoreCache), scored through find_top_k.
+
+    python -m benchmarks.score_cache --pool 2000 --searches 5000 --edit-rate 0.02
+
+Each search picks a random waiting user; with probability --edit-rate a
+random user re-saves their profile first (version bump), like a
+dashboard_page save between searches.
+"""
+import argparse
+import random
+import time
+
+from matching import find_top_k, score
+from match_index import SubjectIndex
+from score_cache import PairScoreCache, PAIR_CACHE_SIZE
+from benchmarks.synthetic import generate_profiles
+
+def run(n, searches, edit_rate, maxsize, seed):
+    users = generate_profiles(n, seed)
+    for u in users:
+        u["version"] = 1
+    index = SubjectIndex()
+    index.rebuild(users)
+    rng = random.Random(seed)
+    plan = [(rng.choice(users), rng.choice(users) if rng.random() < edit_rate else None)
+            for _ in range(searches)]
+
+    cache = PairScoreCache(score, maxsize, symmetric=True)
+    timings = {}
+    for name, fn in (("uncached", score), ("cached", cache.score)):
+        for u in users: u["version"] = 1
+        start = time.perf_counter()
+        for me, edited in plan:
+            if edited is not None: edited["version"] += 1
+            find_top_k(me, index.candidates(me), score_fn=fn)
+        timings[name] = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"pool={n:,} searches={searches:,} edit_rate={edit_rate} maxsize={maxsize:,}")
+    print(f"uncached {timings['uncached'] / searches * 1e3:8.3f} ms/search")
+    print(f"cached   {timings['cached'] / searches * 1e3:8.3f} ms/search  "
+          f"hit_rate={stats['hit_rate']:.1%}  size={stats['size']:,}  evictions={stats['evictions']:,}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.score_cache")
+    parser.add_argument("--pool", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=5000)
+    parser.add_argument("--edit-rate", type=float, default=0.02)
+    parser.add_argument("--maxsize", type=int, default=PAIR_CACHE_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    run(args.pool, args.searches, args.edit_rate, args.maxsize, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark: set-based matching.score (pre-bitmask) vs the bitmask score.
+
+    python -m benchmarks.score_masks
+"""
+import random
+import timeit
+
+from matching import score
+from subject_masks import SUBJECT_BITS, encode_subjects
+
+SUBJECTS = list(SUBJECT_BITS)
+GRADES = [f"Grade {i}" for i in range(1, 11)]
+TIME_SLOTS = ["4-5 PM", "5-6 PM", "6-7 PM"]
+
+def score_sets(u1, u2):
+    # matching.score before subjects were stored as bitmasks
+    s = 0
+    s += len(set(u1["weak"]) & set(u2["strong"])) * 25
+    s += len(set(u2["weak"]) & set(u1["strong"])) * 25
+    if u1["grade"] == u2["grade"]: s += 10
+    if u1["time"] == u2["time"]: s += 10
+    return s
+
+def make_users(n, seed=0):
+    rng = random.Random(seed)
+    users = []
+    for i in range(n):
+        strong = rng.sample(SUBJECTS, rng.randint(0, 3))
+        weak = rng.sample([s for s in SUBJECTS if s not in strong], rng.randint(0, 2))
+        users.append({
+            "user_id": i, "grade": rng.choice(GRADES), "time": rng.choice(TIME_SLOTS),
+            "strong": strong, "weak": weak,
+            "strong_mask": encode_subjects(strong), "weak_mask": encode_subjects(weak),
+        })
+    return users
+
+def main(n=2000, repeat=5):
+    users = make_users(n)
+    me = users[0]
+
+    for u in users:
+        assert score(me, u) == score_sets(me, u)
+
+    for name, fn in (("sets", score_sets), ("bitmask", score)):
+        best = min(timeit.repeat(lambda: [fn(me, u) for u in users], number=10, repeat=repeat))
+        print(f"{name:>8}: {best / (10 * n) * 1e9:8.1f} ns/pair")
+
+if __name__ == "__main__":
+    main()
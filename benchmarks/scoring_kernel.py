@@ -0,0 +1,57 @@
+"""
+Per-pair timing: scoring_kernel vs the legacy scorers.
+
+    python -m benchmarks.scoring_kernel [--pool 20000]
+
+Both run over the same synthetic pool. That they score identically is
+checked by tests/test_scoring_kernel.py.
+"""
+import argparse
+import timeit
+
+from matching import score as matching_score
+from scoring_kernel import ScoringKernel
+from benchmarks.legacy import load_functions
+from benchmarks.synthetic import generate_profiles
+
+def legacy_scorers():
+    app6, = load_functions("app6.py", "calculate_match_score")
+    app4, = load_functions("app4.py", "calculate_match_score")
+    app5, = load_functions("app5.py", "calculate_match_score")
+    app2, = load_functions("app2.py", "calculate_match_score")
+    app, = load_functions("app.py", "calculate_match_score")
+    sahay = load_functions("sahay.py", "calculate_match_score", "profile_tokens", "parse_grade")[0]
+    return {
+        "matching": matching_score,
+        "app6": lambda a, b: app6(a, b)[0],
+        "app4": lambda a, b: app4(a, b)[0],
+        "app5": lambda a, b: app5(a, b)[0],
+        "app2": lambda a, b: app2(a, b)[0],
+        "app": app,
+        "sahay": sahay,
+    }
+
+def time_per_pair(pool_size, repeat=3, seed=0):
+    users = generate_profiles(pool_size, seed)
+    me = users[0]
+    legacy = legacy_scorers()
+    print(f"\nper-pair cost over {pool_size} synthetic profiles (ns/pair, best of {repeat})")
+    for variant in ("matching", "app6", "app4", "sahay"):
+        ref = legacy[variant]
+        kernel = ScoringKernel(variant)
+        compiled = [kernel.compile(u) for u in users]
+        cme, kscore = compiled[0], kernel.score
+        t_legacy = min(timeit.repeat(lambda: [ref(me, u) for u in users], number=1, repeat=repeat))
+        t_kernel = min(timeit.repeat(lambda: [kscore(cme, c) for c in compiled], number=1, repeat=repeat))
+        print(f"{variant:<9} legacy {t_legacy / pool_size * 1e9:8.1f}  kernel {t_kernel / pool_size * 1e9:8.1f}"
+              f"  ({t_legacy / t_kernel:4.1f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scoring_kernel")
+    parser.add_argument("--pool", type=int, default=20000, help="pool size for timing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    time_per_pair(args.pool, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Seeded synthetic profiles for the matching benchmarks.
+
+Each profile carries the fields every scorer variant reads: the SQLite
+shape used by matching.py (masks) and app6.py (lists), and the Supabase
+shape used by app.py / sahay.py (comma strings, languages, topics).
+"""
+import random
+
+from subject_masks import SUBJECTS, LANGUAGES, TIME_SLOTS, encode_subjects
+
+ROLES = ["Student", "Teacher"]
+GRADES = [f"Grade {i}" for i in range(1, 11)]
+TOPICS = ["Algebra", "Fractions", "Geometry", "Grammar", "Essay Writing",
+          "Thermodynamics", "Optics", "Periodic Table", "Mughal Empire", ""]
+
+# Teachers are scarce (README: student-teacher ratios up to 1:40)
+TEACHER_SHARE = 0.05
+
+def generate_profiles(n, seed=0, teacher_share=TEACHER_SHARE):
+    rng = random.Random(seed)
+    shared = {}
+
+    def intern(items):
+        # Identical subject/language lists are shared so 1M profiles fit in memory
+        key = tuple(items)
+        return shared.setdefault(key, list(key))
+
+    users = []
+    for i in range(n):
+        role = "Teacher" if rng.random() < teacher_share else "Student"
+        grade = rng.choice(GRADES)
+        time_slot = rng.choice(TIME_SLOTS)
+        if role == "Teacher":
+            strong, weak, teaches = [], [], rng.sample(SUBJECTS, rng.randint(1, 3))
+        else:
+            strong = rng.sample(SUBJECTS, rng.randint(0, 2))
+            weak = rng.sample([s for s in SUBJECTS if s not in strong], rng.randint(1, 2))
+            teaches = []
+        languages = rng.sample(LANGUAGES, rng.randint(1, 2))
+        strong, weak, teaches = intern(strong), intern(weak), intern(teaches)
+
+        users.append({
+            "user_id": i + 1,
+            "name": f"user{i + 1}",
+            "role": role,
+            "grade": grade,
+            "class": int(grade.split()[-1]),
+            "time": time_slot,
+            "time_slot": time_slot,
+            "strong_subjects": strong,
+            "weak_subjects": weak,
+            "teaches": teaches,
+            "strong_mask": encode_subjects(teaches or strong),
+            "weak_mask": encode_subjects(weak),
+            "subjects": ", ".join(teaches or weak),
+            "languages": ",".join(languages),
+            "specific_topics": rng.choice(TOPICS),
+            "status": "waiting",
+        })
+    return users
@@ -0,0 +1,61 @@
+"""
+Time-to-match under a steady arrival stream: best-total-score pairing
+(batch_matching.pair_pool) vs the aging queue (batch_matching.pair_by_wait).
+
+    python -m benchmarks.wait_times --minutes 240 --arrivals 20 --round 5
+
+Users arrive on a virtual clock (Poisson, --arrivals per minute) and a
+pairing round runs every --round minutes over everyone still waiting.
+Reports p50/p90/p99/max minutes to match, plus how many were still
+waiting at the end and for how long.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from batch_matching import pair_pool, pair_by_wait
+from benchmarks.synthetic import generate_profiles
+from wait_queue import percentiles
+
+STRATEGIES = {
+    "score": lambda users, now: pair_pool(users),
+    "aging": lambda users, now: pair_by_wait(users, now=now),
+}
+
+def simulate(pair_fn, minutes, arrivals, round_every, seed):
+    rng = np.random.default_rng(seed)
+    stream = iter(generate_profiles(int(minutes * arrivals * 2) + 100, seed))
+    waiting, waits = {}, []
+    start = time.perf_counter()
+    for t in range(0, minutes + 1):
+        now = t * 60.0
+        for _ in range(rng.poisson(arrivals)):
+            u = dict(next(stream), waiting_since=now)
+            waiting[u["user_id"]] = u
+        if t % round_every:
+            continue
+        for a, b, _ in pair_fn(list(waiting.values()), now):
+            for uid in (a, b):
+                waits.append((now - waiting.pop(uid)["waiting_since"]) / 60)
+    left = [(minutes * 60.0 - u["waiting_since"]) / 60 for u in waiting.values()]
+    return waits, left, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.wait_times")
+    parser.add_argument("--minutes", type=int, default=240)
+    parser.add_argument("--arrivals", type=float, default=20, help="new waiting users per minute")
+    parser.add_argument("--round", type=int, default=5, help="minutes between pairing rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for name, fn in STRATEGIES.items():
+        waits, left, elapsed = simulate(fn, args.minutes, args.arrivals, args.round, args.seed)
+        p = percentiles(waits, (50, 90, 99))
+        lp = percentiles(left, (50, 99))
+        print(f"{name:<6} matched={len(waits):>6,}  p50={p[50]:6.1f}  p90={p[90]:6.1f}  p99={p[99]:6.1f}  "
+              f"max={max(waits, default=0):6.1f} min | still waiting={len(left):>5,} "
+              f"(p50 {lp[50]:6.1f}, p99 {lp[99]:6.1f} min)  [{elapsed:.1f}s]", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import time
 from datetime import timedelta
 from database import cursor, conn
 from streak import init_streak, render_streak_ui
+from matching import sync_pool
+from subject_masks import encode_subjects
 
 # -----------------------------------------------------
 # CONSTANTS
@@ -87,9 +89,16 @@ def dashboard_page():
                     strong_subjects,
                     weak_subjects,
                     teaches,
+                    strong_mask,
+                    weak_mask,
+                    teaches_mask,
+                    profile_version,
+                    waiting_since,
                     status
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'waiting')
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                        (SELECT COALESCE(MAX(profile_version), 0) + 1 FROM profiles WHERE user_id = ?),
+                        datetime('now'), 'waiting')
             """, (
                 st.session_state.user_id,
                 role,
@@ -98,9 +107,14 @@ def dashboard_page():
                 time_slot,
                 ",".join(strong),
                 ",".join(weak),
-                ",".join(teaches)
+                ",".join(teaches),
+                encode_subjects(strong),
+                encode_subjects(weak),
+                encode_subjects(teaches),
+                st.session_state.user_id
             ))
             conn.commit()
+            sync_pool([st.session_state.user_id])
 
             st.session_state.edit_profile = False
             st.success("Profile saved successfully.")
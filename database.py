@@ -1,14 +1,153 @@
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from storage import configure, Checkpointer
 
-conn = sqlite3.connect("app.db", check_same_thread=False)
-cursor = conn.cursor()
+DB_PATH = "app.db"
+# Most connections open at once; a thread that finds none free waits
+# up to POOL_TIMEOUT seconds before giving up
+POOL_SIZE = 32
+POOL_TIMEOUT = 30
 
-def init_db():
+def connect(path=DB_PATH):
+    """A new connection with the storage profile (storage.py), outside the pool."""
+    # Pooled connections move between threads, one lease at a time
+    return configure(sqlite3.connect(path, check_same_thread=False))
+
+# =========================================================
+# CONNECTION POOL
+# =========================================================
+# Each thread (every Streamlit script run, the worker, the sweeper) leases
+# its own connection and cursor on first use and keeps it until the thread
+# ends, so concurrent users no longer share one cursor. Finished threads
+# hand their connection back for reuse instead of closing it.
+class _Lease:
+    def __init__(self, pool):
+        self.pool = pool
+        self.db = pool._acquire()
+        self.cursor = self.db.cursor()
+
+    def __del__(self):
+        # Runs when the owning thread's locals are dropped, and for a lease
+        # whose _acquire() raised (pool timeout): that one holds no slot
+        db = getattr(self, "db", None)
+        if db is not None: self.pool._release(db)
+
+class ConnectionPool:
+    def __init__(self, path=DB_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.waits = 0
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock: self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                raise TimeoutError(f"no free database connection after {self.timeout}s ({self.size} in use)")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            db = connect(self.path)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock: self.opened += 1
+        return db
+
+    def _release(self, db):
+        try:
+            # Don't pass on a transaction the last owner left open
+            if db.in_transaction: db.rollback()
+            self._idle.put(db)
+        except sqlite3.Error:
+            db.close()
+        finally:
+            self._slots.release()
+
+    def _lease(self):
+        lease = getattr(self._local, "lease", None)
+        if lease is None:
+            lease = self._local.lease = _Lease(self)
+        return lease
+
+    def connection(self):
+        """The calling thread's connection."""
+        return self._lease().db
+
+    def cursor(self):
+        """The calling thread's cursor."""
+        return self._lease().cursor
+
+    def release(self):
+        """Hand the calling thread's connection back now (long-lived threads)."""
+        self._local.lease = None
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """
+        Commit the block on success, roll it back on any exception. Inside an
+        already open transaction the block joins it and the outer owner commits.
+        `immediate` takes the write lock up front (read-then-write blocks).
+        """
+        db = self.connection()
+        cur = db.cursor()
+        if db.in_transaction:
+            yield cur
+            return
+        cur.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield cur
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+    def stats(self):
+        return {"size": self.size, "opened": self.opened, "idle": self._idle.qsize(), "waits": self.waits}
+
+class _ThreadBound:
+    """Forwards attribute access to the calling thread's connection or cursor."""
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+pool = ConnectionPool()
+transaction = pool.transaction
+# Module-level names kept for existing callers; each thread gets its own
+conn = _ThreadBound(pool.connection)
+cursor = _ThreadBound(pool.cursor)
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+def start_checkpointer():
+    """Start this process's WAL checkpoint thread, once."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = Checkpointer(connect, DB_PATH)
+        return _checkpointer.start()
+
+def init_db(db=None):
+    """Create or migrate the schema on `db` (default: app.db through the pool)."""
+    cur = (conn if db is None else db).cursor()
 
     # -------------------------
     # AUTH USERS
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS auth_users (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT,
@@ -20,7 +159,7 @@ def init_db():
     # -------------------------
     # PROFILES
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS profiles (
         user_id INTEGER UNIQUE,
         role TEXT,
@@ -40,7 +179,7 @@ def init_db():
     # -------------------------
     def add_column_if_missing(sql):
         try:
-            cursor.execute(sql)
+            cur.execute(sql)
         except sqlite3.OperationalError:
             pass
 
@@ -48,10 +187,50 @@ def init_db():
         "ALTER TABLE profiles ADD COLUMN class_level INTEGER"
     )
 
+    # Subject bitmasks (see subject_masks.py), computed on profile save
+    for col in ("strong_mask", "weak_mask", "teaches_mask"):
+        add_column_if_missing(
+            f"ALTER TABLE profiles ADD COLUMN {col} INTEGER"
+        )
+
+    # Bumped on every profile save; keys the pair-score cache (score_cache.py)
+    add_column_if_missing(
+        "ALTER TABLE profiles ADD COLUMN profile_version INTEGER DEFAULT 0"
+    )
+
+    # Wait-time tracking for the aging queue (wait_queue.py)
+    add_column_if_missing(
+        "ALTER TABLE profiles ADD COLUMN waiting_since TEXT"
+    )
+    add_column_if_missing(
+        "ALTER TABLE profiles ADD COLUMN matched_at TEXT"
+    )
+
+    # -------------------------
+    # TABLE VERSIONS
+    # -------------------------
+    # Bumped by trigger on every write to profiles, from any connection or
+    # process; keys the cached mentor pools (profile_cache.py)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    cur.execute("INSERT OR IGNORE INTO table_versions (name) VALUES ('profiles')")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS profiles_version_{event.lower()}
+        AFTER {event} ON profiles
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = 'profiles';
+        END
+        """)
+
     # -------------------------
     # CHAT MESSAGES
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS messages (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         match_id TEXT,
@@ -64,7 +243,7 @@ def init_db():
     # -------------------------
     # SESSION FILES
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS session_files (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         match_id TEXT,
@@ -78,7 +257,7 @@ def init_db():
     # -------------------------
     # LEGACY RATINGS (KEEP)
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS ratings (
         mentor TEXT,
         mentee TEXT,
@@ -87,10 +266,15 @@ def init_db():
     )
     """)
 
+    # Names aren't unique; the mentor's auth_users.id says who was rated
+    add_column_if_missing(
+        "ALTER TABLE ratings ADD COLUMN mentor_id INTEGER"
+    )
+
     # -------------------------
     # SESSION RATINGS (NEW)
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS session_ratings (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         match_id TEXT,
@@ -101,10 +285,23 @@ def init_db():
     )
     """)
 
+    # -------------------------
+    # MENTOR STATS (see mentor_stats.py)
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS mentor_stats (
+        user_id INTEGER PRIMARY KEY,
+        rating_count INTEGER NOT NULL DEFAULT 0,
+        rating_sum INTEGER NOT NULL DEFAULT 0,
+        bayes_mean REAL NOT NULL,
+        updated_at TEXT DEFAULT (datetime('now'))
+    )
+    """)
+
     # -------------------------
     # USER STREAKS (MOVED HERE ✅)
     # -------------------------
-    cursor.execute("""
+    cur.execute("""
     CREATE TABLE IF NOT EXISTS user_streaks (
         user_id INTEGER PRIMARY KEY,
         streak INTEGER DEFAULT 0,
@@ -112,4 +309,21 @@ def init_db():
     )
     """)
 
-    conn.commit()
+    # -------------------------
+    # MATCH PROPOSALS (BATCH MATCHER)
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS match_proposals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id TEXT,
+        user_a INTEGER,
+        user_b INTEGER,
+        score INTEGER,
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_match_proposals_a ON match_proposals (user_a)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_match_proposals_b ON match_proposals (user_b)")
+
+    cur.connection.commit()
+    if db is None: start_checkpointer()
@@ -0,0 +1,69 @@
+from collections import defaultdict
+from matching import score, MATCH_THRESHOLD
+from subject_masks import iter_bits
+
+# Mentees per Teacher in one group session
+GROUP_SIZE = 4
+
+# =========================================================
+# GROUP PACKING
+# =========================================================
+# Teachers are the bins (capacity GROUP_SIZE, one subject and slot each)
+# and mentees are the items. Best-fit decreasing: mentees are placed in
+# order of their best achievable score, each into the open group where it
+# scores highest (fuller groups win ties), and a new Teacher is opened only
+# when no open group fits. Filling groups before opening new ones leaves
+# the scarce Teachers free for other subjects in the same slot.
+def group_match_id(teacher_id, member_ids):
+    """Group match_id, usable as messages.match_id like the 1:1 'a-b' ids."""
+    return f"g{teacher_id}-" + "-".join(str(m) for m in sorted(member_ids))
+
+def is_group_match(match_id):
+    return str(match_id).startswith("g")
+
+def pack_groups(users, group_size=GROUP_SIZE, threshold=MATCH_THRESHOLD):
+    """
+    Pack waiting mentees into Teacher-led groups. Returns a list of
+    (teacher_id, subject_bit, [(mentee_id, score), ...]); every mentee
+    shares the group's slot and has its subject among their weak subjects.
+    """
+    teachers = defaultdict(list)
+    for u in users:
+        if u["role"] == "Teacher":
+            for bit in iter_bits(u["strong_mask"]):
+                teachers[(u["time"], bit)].append(u)
+
+    options = []
+    for pos, u in enumerate(users):
+        if u["role"] == "Teacher":
+            continue
+        opts = [(score(u, t), t["user_id"], bit)
+                for bit in iter_bits(u["weak_mask"])
+                for t in teachers.get((u["time"], bit), ())]
+        opts = [o for o in opts if o[0] >= threshold]
+        if opts:
+            options.append((max(o[0] for o in opts), pos, u["user_id"], opts))
+    options.sort(key=lambda x: (-x[0], x[1]))
+
+    groups = {}
+    for _, _, uid, opts in options:
+        fits = [(sc, len(groups[t][1]), t) for sc, t, bit in opts
+                if t in groups and groups[t][0] == bit and len(groups[t][1]) < group_size]
+        if fits:
+            sc, _, t = max(fits)
+        else:
+            free = [(sc, -t, t, bit) for sc, t, bit in opts if t not in groups]
+            if not free:
+                continue
+            sc, _, t, bit = max(free)
+            groups[t] = (bit, [])
+        groups[t][1].append((uid, sc))
+    return [(t, bit, members) for t, (bit, members) in groups.items()]
+
+def group_proposals(groups):
+    """match_proposals rows (match_id, teacher, mentee, score) for packed groups."""
+    rows = []
+    for teacher, _, members in groups:
+        mid = group_match_id(teacher, [m for m, _ in members])
+        rows += [(mid, teacher, m, sc) for m, sc in members]
+    return rows
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from subject_masks import iter_bits
+
+# =========================================================
+# SUBJECT INDEX
+# =========================================================
+class SubjectIndex:
+    """
+    In-process inverted index over the waiting pool.
+    `strong` maps a subject bit to users who can help with it (strong/teaches),
+    `weak` maps a subject bit to users who need help with it.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.order = {}
+        self.strong = defaultdict(set)
+        self.weak = defaultdict(set)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.users)
+
+    def __contains__(self, user_id):
+        return user_id in self.users
+
+    def add(self, user):
+        uid = user["user_id"]
+        self.remove(uid)
+        self.users[uid] = user
+        self.order[uid] = self._seq
+        self._seq += 1
+        for bit in iter_bits(user["strong_mask"]):
+            self.strong[bit].add(uid)
+        for bit in iter_bits(user["weak_mask"]):
+            self.weak[bit].add(uid)
+
+    def remove(self, user_id):
+        user = self.users.pop(user_id, None)
+        if user is None:
+            return
+        del self.order[user_id]
+        for bit in iter_bits(user["strong_mask"]):
+            self.strong[bit].discard(user_id)
+            if not self.strong[bit]: del self.strong[bit]
+        for bit in iter_bits(user["weak_mask"]):
+            self.weak[bit].discard(user_id)
+            if not self.weak[bit]: del self.weak[bit]
+
+    def rebuild(self, users):
+        self.__init__()
+        for u in users:
+            self.add(u)
+
+    def candidates(self, current):
+        """
+        Waiting users sharing at least one complementary subject with `current`,
+        in the order they entered the pool (so ties break like a full scan).
+        """
+        ids = set()
+        for bit in iter_bits(current["weak_mask"]):
+            ids |= self.strong.get(bit, set())
+        for bit in iter_bits(current["strong_mask"]):
+            ids |= self.weak.get(bit, set())
+        ids.discard(current["user_id"])
+        return sorted((self.users[i] for i in ids), key=lambda u: self.order[u["user_id"]])
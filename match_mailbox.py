@@ -0,0 +1,45 @@
+import threading
+
+# Seconds a waiting user blocks on the mailbox per page run
+MAILBOX_WAIT = 3.0
+
+# =========================================================
+# MATCH MAILBOX
+# =========================================================
+class MatchMailbox:
+    """
+    In-process pub/sub for "someone matched you". The user who books a
+    match posts (partner, match_id) to the other user's box; the waiting
+    user long-polls wait(), which is one dict lookup plus an Event wait,
+    instead of querying the database. One Event per waiting user, so a post
+    wakes only its recipient.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._box = {}
+        self._events = {}
+
+    def post(self, user, message):
+        with self._lock:
+            self._box[user] = message
+            self._events.setdefault(user, threading.Event()).set()
+
+    def wait(self, user, timeout=MAILBOX_WAIT):
+        """The pending message for `user`, waiting up to `timeout` seconds; None if none came."""
+        with self._lock:
+            if user in self._box:
+                self._events.pop(user, None)
+                return self._box.pop(user)
+            event = self._events.setdefault(user, threading.Event())
+        event.wait(timeout)
+        with self._lock:
+            # A later post creates a fresh Event, so dropping this one loses nothing
+            if self._events.get(user) is event: del self._events[user]
+            return self._box.pop(user, None)
+
+    def discard(self, user):
+        with self._lock:
+            self._box.pop(user, None)
+            event = self._events.pop(user, None)
+        if event: event.set()
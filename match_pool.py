@@ -0,0 +1,97 @@
+import threading
+from match_index import SubjectIndex
+from ann_index import AnnIndex
+
+# Pools at least this large answer candidates() from the LSH index
+ANN_MIN_POOL = 100_000
+
+# =========================================================
+# SHARED MATCHING POOL
+# =========================================================
+class MatchPool:
+    """
+    Waiting pool loaded once per process and then kept current with deltas
+    (profile saved, matched, released). `version` increases on every change,
+    so callers can tell when results computed from the pool are stale.
+    Once the pool reaches `ann_min_pool` users, candidates() switches to an
+    approximate LSH index (built on first use, then kept current).
+    """
+
+    def __init__(self, loader, ann_min_pool=ANN_MIN_POOL):
+        self._loader = loader
+        self.ann_min_pool = ann_min_pool
+        self.ann = None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.index = SubjectIndex()
+        self.version = 0
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.index.rebuild(self._loader())
+            self._loaded = True
+            self.version += 1
+
+    def reload(self):
+        with self._lock:
+            self._loaded = False
+            self.ann = None
+            self._ensure_loaded()
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self.index)
+
+    def __contains__(self, user_id):
+        with self._lock:
+            self._ensure_loaded()
+            return user_id in self.index
+
+    def get(self, user_id):
+        with self._lock:
+            self._ensure_loaded()
+            return self.index.users.get(user_id)
+
+    def users(self):
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(self.index.users.values(), key=lambda u: self.index.order[u["user_id"]])
+
+    def candidates(self, current, exact=False):
+        """
+        Users worth scoring against `current`. Exact (SubjectIndex) for small
+        pools; approximate for large ones, so re-rank with score() either way.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if exact or len(self.index) < self.ann_min_pool:
+                return self.index.candidates(current)
+            if self.ann is None:
+                self.ann = AnnIndex()
+                self.ann.rebuild(self.users())
+            return self.ann.candidates(current)
+
+    def upsert(self, user):
+        with self._lock:
+            self._ensure_loaded()
+            self.index.add(user)
+            if self.ann is not None: self.ann.add(user)
+            self.version += 1
+
+    def remove(self, user_id):
+        with self._lock:
+            self._ensure_loaded()
+            if user_id in self.index:
+                self.index.remove(user_id)
+                if self.ann is not None: self.ann.remove(user_id)
+                self.version += 1
+
+    def apply(self, user_ids, waiting):
+        """Delta for `user_ids`: those in `waiting` are (re)added, the rest removed."""
+        waiting = {u["user_id"]: u for u in waiting}
+        with self._lock:
+            for uid in user_ids:
+                if uid in waiting: self.upsert(waiting[uid])
+                else: self.remove(uid)
+            return self.version
@@ -0,0 +1,70 @@
+import argparse
+import time
+from database import init_db
+from matching import load_profiles
+from batch_matching import pair_pool, pair_partitioned, pair_by_wait, write_proposals
+from group_matching import pack_groups, group_proposals, GROUP_SIZE
+from profile_cache import profiles_version
+
+# =========================================================
+# BACKGROUND MATCHMAKING WORKER
+# =========================================================
+# Run with:  python -m matching worker [--interval 60] [--poll 2] [--once]
+#                                     [--partitioned [--workers N] | --aging]
+#                                     [--groups [--group-size N]]
+#
+# With --groups, Teachers are first packed into group sessions
+# (group_matching.py) and everyone left is paired 1:1 as usual.
+#
+# Matching runs once per tick over the SQLite waiting pool and the
+# results go to match_proposals, which matchmaking_page only reads.
+# A tick happens every `interval` seconds, or sooner when profiles change
+# (profile_cache.ProfilesVersion, bumped by trigger on any insert, update
+# or delete from any connection), checked every `poll`. Commits to other
+# tables (chat, ratings, the proposals written here) don't count.
+WORKER_INTERVAL = 60
+POLL_INTERVAL = 2
+
+def run_once(partitioned=False, workers=None, aging=False, group_size=0):
+    start = time.perf_counter()
+    users = load_profiles()
+    waiting = len(users)
+    groups = pack_groups(users, group_size) if group_size else []
+    if groups:
+        grouped = {t for t, _, _ in groups} | {m for _, _, members in groups for m, _ in members}
+        users = [u for u in users if u["user_id"] not in grouped]
+    if aging: pairs = pair_by_wait(users)
+    elif partitioned: pairs = pair_partitioned(users, max_workers=workers)
+    else: pairs = pair_pool(users)
+    write_proposals(pairs, group_proposals(groups))
+    print(f"[worker] {len(groups)} groups and {len(pairs)} pairs proposed from {waiting} waiting "
+          f"in {time.perf_counter() - start:.2f}s", flush=True)
+    return pairs
+
+def run_worker(interval=WORKER_INTERVAL, poll=POLL_INTERVAL, partitioned=False, workers=None, aging=False, group_size=0):
+    last_version, last_run = None, 0.0
+    while True:
+        version = profiles_version.current()
+        if version != last_version or time.monotonic() - last_run >= interval:
+            run_once(partitioned, workers, aging, group_size)
+            last_version, last_run = version, time.monotonic()
+        time.sleep(poll)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m matching worker")
+    parser.add_argument("--interval", type=float, default=WORKER_INTERVAL, help="seconds between forced runs")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between pool change checks")
+    parser.add_argument("--once", action="store_true", help="run a single tick and exit")
+    parser.add_argument("--partitioned", action="store_true", help="shard by time slot and grade band across processes")
+    parser.add_argument("--workers", type=int, default=None, help="processes for --partitioned (default: all cores)")
+    parser.add_argument("--aging", action="store_true", help="serve the longest waiting users first (wait_queue.py)")
+    parser.add_argument("--groups", action="store_true", help="pack Teachers into group sessions first (group_matching.py)")
+    parser.add_argument("--group-size", type=int, default=GROUP_SIZE, help="mentees per Teacher with --groups")
+    args = parser.parse_args(argv)
+
+    init_db()
+    group_size = args.group_size if args.groups else 0
+    if args.once:
+        run_once(args.partitioned, args.workers, args.aging, group_size)
+    else:
+        run_worker(args.interval, args.poll, args.partitioned, args.workers, args.aging, group_size)
@@ -1,36 +1,62 @@
 import streamlit as st
 import os
-from database import cursor, conn
+import heapq
+from database import cursor, conn, transaction
+from match_pool import MatchPool
+from score_cache import PairScoreCache
+from subject_masks import encode_subjects
+from wait_queue import wait_boost
+from mentor_stats import record_rating, rated_users, quality_bonus, PRIOR_MEAN
 from ai_helper import ask_ai, generate_quiz_from_chat
 
 UPLOAD_DIR = "uploads/sessions"
 MATCH_THRESHOLD = 30
+TOP_K = 5
+# Rank candidates by mentor quality (mentor_stats) as well as score and wait
+QUALITY_MODE = True
 
 # =========================================================
 # MATCHING LOGIC
 # =========================================================
-def load_profiles():
-    cursor.execute("""
+def profile_masks(strong, weak, teaches, strong_mask=None, weak_mask=None, teaches_mask=None):
+    """(strong_mask, weak_mask) for scoring; rows saved before the mask columns fall back to the text."""
+    if strong_mask is None: strong_mask = encode_subjects(strong)
+    if weak_mask is None: weak_mask = encode_subjects(weak)
+    if teaches_mask is None: teaches_mask = encode_subjects(teaches)
+    return (teaches_mask or strong_mask), weak_mask
+
+def load_profiles(user_ids=None):
+    query = """
         SELECT a.id, a.name, p.role, p.grade, p.time,
-               p.strong_subjects, p.weak_subjects, p.teaches
+               p.strong_subjects, p.weak_subjects, p.teaches,
+               p.strong_mask, p.weak_mask, p.teaches_mask, p.profile_version,
+               CAST(strftime('%s', COALESCE(p.waiting_since, p.created_at)) AS INTEGER),
+               ms.bayes_mean
         FROM profiles p
         JOIN auth_users a ON a.id = p.user_id
+        LEFT JOIN mentor_stats ms ON ms.user_id = p.user_id
         WHERE p.status = 'waiting'
-    """)
+    """
+    params = ()
+    if user_ids is not None:
+        query += f" AND p.user_id IN ({','.join('?' * len(user_ids))})"
+        params = tuple(user_ids)
+    cursor.execute(query, params)
     rows = cursor.fetchall()
     users = []
     for r in rows:
+        strong_mask, weak_mask = profile_masks(*r[5:11])
         users.append({
             "user_id": r[0], "name": r[1], "role": r[2], "grade": r[3],
-            "time": r[4], "strong": (r[7] or r[5] or "").split(","),
-            "weak": (r[6] or "").split(",")
+            "time": r[4], "strong_mask": strong_mask, "weak_mask": weak_mask,
+            "version": r[11] or 0, "waiting_since": r[12],
+            "quality": PRIOR_MEAN if r[13] is None else r[13]
         })
     return users
 
 def score(u1, u2):
-    s = 0
-    s += len(set(u1["weak"]) & set(u2["strong"])) * 25
-    s += len(set(u2["weak"]) & set(u1["strong"])) * 25
+    s = ((u1["weak_mask"] & u2["strong_mask"]).bit_count()
+         + (u2["weak_mask"] & u1["strong_mask"]).bit_count()) * 25
     if u1["grade"] == u2["grade"]: s += 10
     if u1["time"] == u2["time"]: s += 10
     return s
@@ -43,6 +69,53 @@ def find_best(current, users):
         if sc > best_s: best, best_s = u, sc
     return (best, best_s) if best_s >= MATCH_THRESHOLD else (None, 0)
 
+def find_top_k(current, users, k=TOP_K, score_fn=score, boost=None):
+    """
+    The k best (user, score) pairs above MATCH_THRESHOLD, best first, in one
+    pass with a bounded min-heap. Ties keep pool order, as in find_best.
+    `boost(u)` adds ranking points (e.g. wait_boost) without affecting the
+    threshold or the returned score.
+    """
+    heap = []
+    for pos, u in enumerate(users):
+        if u["user_id"] == current["user_id"]: continue
+        sc = score_fn(current, u)
+        if sc < MATCH_THRESHOLD: continue
+        item = (sc + boost(u) if boost else sc, -pos, u, sc)
+        if len(heap) < k: heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]: heapq.heapreplace(heap, item)
+    return [(u, sc) for _, _, u, sc in sorted(heap, key=lambda x: x[:2], reverse=True)]
+
+# =========================================================
+# WAITING POOL
+# =========================================================
+# Users without a complementary subject score at most 20 (grade + time),
+# which is below MATCH_THRESHOLD, so find_best over the pool candidates
+# returns the same match as a scan over the whole waiting pool.
+@st.cache_resource
+def get_pool():
+    return MatchPool(load_profiles)
+
+# The pair-score cache starts off (size 0): the bitmask score() is cheaper
+# than a cache lookup (benchmarks/score_cache.py: ~0.9 ms per search
+# uncached vs ~3.6 ms cached). Only size it, with score_cache.PAIR_CACHE_SIZE,
+# if score() becomes costlier.
+@st.cache_resource
+def get_score_cache():
+    return PairScoreCache(score, 0, symmetric=True)
+
+def cached_score():
+    cache = get_score_cache()
+    return cache.score if cache.maxsize else score
+
+def rank_boost(u):
+    """Ranking-only points for find_top_k: time waited, plus mentor quality in QUALITY_MODE."""
+    return wait_boost(u) + (quality_bonus(u) if QUALITY_MODE else 0)
+
+def sync_pool(user_ids):
+    """Re-read the given users and add/remove them from the pool by status."""
+    return get_pool().apply(user_ids, load_profiles(user_ids))
+
 # =========================================================
 # DATABASE HELPERS
 # =========================================================
@@ -54,9 +127,74 @@ def send_msg(mid, sender, message):
     cursor.execute("INSERT INTO messages (match_id, sender, message) VALUES (?, ?, ?)", (mid, sender, message))
     conn.commit()
 
-def end_session(match_id):
-    cursor.execute("UPDATE profiles SET status='waiting', match_id=NULL WHERE match_id=?", (match_id,))
-    conn.commit()
+def reserve_pair(user_a, user_b, match_id, db=conn):
+    """
+    Compare-and-set booking: both users move from 'waiting' to 'matched' in one
+    transaction, or neither does. Returns False on conflict (someone else got
+    there first) so the caller can try its next candidate.
+    """
+    return reserve_group([user_a, user_b], match_id, db)
+
+def reserve_group(user_ids, match_id, db=conn):
+    """
+    reserve_pair for any number of users (group sessions): all or none.
+    Inside a caller's open transaction it works in a savepoint, so a
+    conflict undoes only the reservation and the caller commits.
+    """
+    cur = db.cursor()
+    nested = db.in_transaction
+
+    def undo():
+        if nested:
+            cur.execute("ROLLBACK TO reserve_group")
+            cur.execute("RELEASE reserve_group")
+        else:
+            db.rollback()
+
+    cur.execute("SAVEPOINT reserve_group" if nested else "BEGIN IMMEDIATE")
+    try:
+        cur.execute(f"""
+            UPDATE profiles SET status='matched', match_id=?, matched_at=datetime('now')
+            WHERE user_id IN ({','.join('?' * len(user_ids))}) AND status='waiting'
+        """, (match_id, *user_ids))
+        if cur.rowcount != len(set(user_ids)):
+            undo()
+            return False
+        if nested: cur.execute("RELEASE reserve_group")
+        else: db.commit()
+        return True
+    except Exception:
+        undo()
+        raise
+
+def release_session(cur, match_id, user_id):
+    """
+    `user_id` leaves `match_id`: set whoever that frees back to 'waiting'
+    and return their ids. A 1:1 session frees both. In a group session ('g...'
+    ids, group_matching.group_match_id) a mentee frees only themselves; the
+    Teacher, and with them the rest of the group, is freed when the Teacher
+    ends it or the last mentee leaves.
+    """
+    cur.execute("SELECT user_id, role FROM profiles WHERE match_id=?", (match_id,))
+    members = cur.fetchall()
+    if user_id not in (uid for uid, _ in members):
+        return []
+    release = [uid for uid, _ in members]
+    if str(match_id).startswith("g"):
+        teacher = [uid for uid, role in members if role == "Teacher"]
+        others = [uid for uid, role in members if role != "Teacher" and uid != user_id]
+        if user_id not in teacher and others:
+            release = [user_id]
+    cur.execute(f"""
+        UPDATE profiles SET status='waiting', match_id=NULL, waiting_since=datetime('now')
+        WHERE match_id=? AND user_id IN ({','.join('?' * len(release))})
+    """, (match_id, *release))
+    return release
+
+def end_session(match_id, user_id):
+    with transaction(immediate=True) as cur:
+        user_ids = release_session(cur, match_id, user_id)
+    sync_pool(user_ids)
 
 # =========================================================
 # UI COMPONENTS
@@ -77,17 +215,65 @@ def show_rating_ui(match_id):
             return
         # Note: You need a session_ratings table in your DB for this to work
         try:
-            cursor.execute("""
-                INSERT INTO session_ratings (match_id, rater_id, rater_name, rating) 
-                VALUES (?, ?, ?, ?)
-            """, (match_id, st.session_state.user_id, st.session_state.user_name, st.session_state.rating))
-            conn.commit()
+            with transaction() as cur:
+                cur.execute("""
+                    INSERT INTO session_ratings (match_id, rater_id, rater_name, rating) 
+                    VALUES (?, ?, ?, ?)
+                """, (match_id, st.session_state.user_id, st.session_state.user_name, st.session_state.rating))
+                rated = rated_users(match_id, st.session_state.user_id)
+                for uid in rated:
+                    record_rating(uid, st.session_state.rating, cur)
+            sync_pool(rated)
             st.success("Thank you for your feedback!")
             st.session_state.rating_submitted = True
             st.rerun()
         except Exception as e:
             st.error(f"Error saving rating: {e}")
 
+def load_proposal(user):
+    """The worker's proposal for `user` as (partner, score), if the partner is still waiting."""
+    cursor.execute("""
+        SELECT user_a, user_b, score FROM match_proposals
+        WHERE (user_a = ? OR user_b = ?) AND match_id NOT LIKE 'g%'
+    """, (user["user_id"], user["user_id"]))
+    row = cursor.fetchone()
+    if not row: return None
+    partner_id = row[1] if row[0] == user["user_id"] else row[0]
+    partner = get_pool().get(partner_id)
+    return (partner, row[2]) if partner else None
+
+def load_group_proposal(user):
+    """
+    The worker's group proposal involving `user` (group_matching.py) as
+    (match_id, teacher, mentees still waiting), or None.
+    """
+    cursor.execute("""
+        SELECT user_a, user_b, match_id FROM match_proposals
+        WHERE match_id = (
+            SELECT match_id FROM match_proposals
+            WHERE (user_a = ? OR user_b = ?) AND match_id LIKE 'g%' LIMIT 1
+        )
+    """, (user["user_id"], user["user_id"]))
+    rows = cursor.fetchall()
+    if not rows: return None
+    pool = get_pool()
+    teacher = pool.get(rows[0][0])
+    mentees = [m for m in (pool.get(r[1]) for r in rows) if m]
+    return (rows[0][2], teacher, mentees) if teacher and mentees else None
+
+def next_candidate():
+    """Move the proposal to the next ranked candidate still in the pool."""
+    pool = get_pool()
+    ranked = st.session_state.get("proposed_candidates") or []
+    while ranked:
+        m, s = ranked.pop(0)
+        if m["user_id"] in pool:
+            st.session_state.proposed_match, st.session_state.proposed_score = m, s
+            st.session_state.proposed_version = pool.version
+            return m
+    st.session_state.proposed_match = None
+    return None
+
 # =========================================================
 # MATCHMAKING PAGE
 # =========================================================
@@ -99,32 +285,73 @@ def matchmaking_page():
 
     st.title("🤝 Peer Learning Hub")
 
-    cursor.execute("SELECT role, grade, time, strong_subjects, weak_subjects, teaches, match_id FROM profiles WHERE user_id = ?", (st.session_state.user_id,))
+    cursor.execute("""
+        SELECT role, grade, time, strong_subjects, weak_subjects, teaches,
+               strong_mask, weak_mask, teaches_mask, match_id, profile_version
+        FROM profiles WHERE user_id = ?
+    """, (st.session_state.user_id,))
     row = cursor.fetchone()
     if not row: return st.warning("Please complete your profile first.")
 
-    role, grade, time_slot, strong, weak, teaches, match_id = row
-    user = {"user_id": st.session_state.user_id, "name": st.session_state.user_name, "role": role, "grade": grade, "time": time_slot, 
-            "strong": (teaches or strong or "").split(","), "weak": (weak or "").split(",")}
+    role, grade, time_slot = row[:3]
+    match_id = row[9]
+    strong_mask, weak_mask = profile_masks(*row[3:9])
+    user = {"user_id": st.session_state.user_id, "name": st.session_state.user_name, "role": role, "grade": grade, "time": time_slot,
+            "strong_mask": strong_mask, "weak_mask": weak_mask, "version": row[10] or 0}
 
     # PHASE 1: SEARCHING FOR MATCH
     if not match_id:
-        if st.button("Find Best Match", use_container_width=True):
-            m, s = find_best(user, load_profiles())
-            if m:
-                st.session_state.proposed_match, st.session_state.proposed_score = m, s
+        group = load_group_proposal(user)
+        if group:
+            gid, teacher, mentees = group
+            names = ", ".join(m["name"] for m in mentees)
+            if teacher["user_id"] == user["user_id"]:
+                st.info(f"Group session proposed with **{names}**")
+                if st.button("Start Group Session", use_container_width=True):
+                    ids = [teacher["user_id"]] + [m["user_id"] for m in mentees]
+                    booked = reserve_group(ids, gid)
+                    sync_pool(ids)
+                    if booked: st.rerun()
+                    st.warning("Someone in the group was just matched elsewhere. Refresh to see who is still waiting.")
             else:
+                st.info(f"You are in a proposed group session with **{teacher['name']}** ({names}). It starts when they confirm.")
+
+        if not st.session_state.get("proposed_match"):
+            proposal = load_proposal(user)
+            if proposal:
+                st.session_state.proposed_candidates = [proposal]
+                next_candidate()
+
+        if st.button("Find Best Match", use_container_width=True):
+            pool = get_pool()
+            st.session_state.proposed_candidates = find_top_k(user, pool.candidates(user), score_fn=cached_score(), boost=rank_boost)
+            st.session_state.proposed_version = pool.version
+            if not next_candidate():
                 st.info("No matches found at the moment. Try again later!")
 
         if st.session_state.get("proposed_match"):
             m = st.session_state.proposed_match
             st.info(f"Matched with **{m['name']}** (Score: {st.session_state.proposed_score})")
             if st.button("Confirm and Start Session"):
+                pool = get_pool()
                 mid = f"{user['user_id']}-{m['user_id']}"
-                cursor.execute("UPDATE profiles SET status='matched', match_id=? WHERE user_id IN (?, ?)", (mid, user["user_id"], m["user_id"]))
-                conn.commit()
-                st.session_state.proposed_match = None
-                st.rerun()
+                stale = pool.version != st.session_state.get("proposed_version") and m["user_id"] not in pool
+                if not stale and reserve_pair(user["user_id"], m["user_id"], mid):
+                    sync_pool([user["user_id"], m["user_id"]])
+                    st.session_state.proposed_match = None
+                    st.session_state.proposed_candidates = []
+                    st.rerun()
+
+                # Conflict: the partner (or this user) was booked by someone else
+                sync_pool([user["user_id"], m["user_id"]])
+                if user["user_id"] not in pool:
+                    st.session_state.proposed_match = None
+                    st.rerun()
+                nxt = next_candidate()
+                if nxt:
+                    st.warning(f"{m['name']} was just matched with someone else. Next best match: **{nxt['name']}** (Score: {st.session_state.proposed_score}). Confirm again to start.")
+                    return
+                st.warning(f"{m['name']} is no longer available. Please search again.")
         return
 
     # PHASE 2: ACTIVE SESSION
@@ -142,7 +369,7 @@ def matchmaking_page():
 
         st.divider()
         if st.button("🔴 End Session & Start Quiz", use_container_width=True):
-            end_session(match_id)
+            end_session(match_id, st.session_state.user_id)
             st.session_state.session_ended = True
             st.rerun()
 
@@ -175,3 +402,12 @@ def matchmaking_page():
             st.session_state.rating_submitted = False
             if "quiz_text" in st.session_state: del st.session_state.quiz_text
             st.rerun()
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["worker"]:
+        from match_worker import main
+        main(sys.argv[2:])
+    else:
+        print("usage: python -m matching worker [--interval SECONDS] [--poll SECONDS] [--once] "
+              "[--partitioned [--workers N] | --aging] [--groups [--group-size N]]")
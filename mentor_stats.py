@@ -0,0 +1,77 @@
+from database import conn
+
+# Bayesian prior: every mentor starts as PRIOR_COUNT ratings of PRIOR_MEAN,
+# so one 5-star session doesn't outrank a steady 4.6 over thirty
+PRIOR_MEAN = 3.5
+PRIOR_COUNT = 5
+# Ranking points per star of smoothed mean above (or below) the prior
+QUALITY_WEIGHT = 4
+
+# =========================================================
+# INCREMENTAL MENTOR STATS
+# =========================================================
+# mentor_stats holds a running count, sum and smoothed mean per user and is
+# updated in O(1) with each rating insert, so matching reads a precomputed
+# number instead of aggregating session_ratings / ratings per search.
+def record_rating(user_id, rating, db=conn):
+    """Fold one rating of `user_id` into mentor_stats. The caller commits."""
+    db.execute("""
+        INSERT INTO mentor_stats (user_id, rating_count, rating_sum, bayes_mean)
+        VALUES (?, 1, ?, (? + ? * ?) / (1.0 + ?))
+        ON CONFLICT(user_id) DO UPDATE SET
+            rating_count = rating_count + 1,
+            rating_sum = rating_sum + excluded.rating_sum,
+            bayes_mean = (rating_sum + excluded.rating_sum + ? * ?) / (rating_count + 1.0 + ?),
+            updated_at = datetime('now')
+    """, (user_id, rating, rating, PRIOR_MEAN, PRIOR_COUNT, PRIOR_COUNT,
+          PRIOR_MEAN, PRIOR_COUNT, PRIOR_COUNT))
+
+def rated_users(match_id, rater_id):
+    """
+    Who a session rating is about: the partner for a 1:1 'a-b' match_id,
+    the Teacher for a group 'g<teacher>-...' one (mentees rate the Teacher).
+    """
+    match_id = str(match_id)
+    try:
+        if match_id.startswith("g"):
+            teacher = int(match_id[1:].split("-")[0])
+            return [teacher] if teacher != rater_id else []
+        return [int(u) for u in match_id.split("-") if int(u) != rater_id]
+    except ValueError:
+        return []
+
+def user_id_for_name(name, db=conn):
+    """
+    auth_users.id for a legacy rating that stored only the mentor's name;
+    None when no user or more than one has that name.
+    """
+    rows = db.execute("SELECT id FROM auth_users WHERE name = ? LIMIT 2", (name,)).fetchall()
+    return rows[0][0] if len(rows) == 1 else None
+
+def quality_bonus(user):
+    """Ranking points for a partner's smoothed rating (0 for the unrated)."""
+    return QUALITY_WEIGHT * (user.get("quality", PRIOR_MEAN) - PRIOR_MEAN)
+
+def rebuild(db=conn):
+    """Recompute mentor_stats from session_ratings and the legacy ratings table."""
+    try:
+        db.execute("DELETE FROM mentor_stats")
+        for match_id, rater_id, rating in db.execute(
+                "SELECT match_id, rater_id, rating FROM session_ratings ORDER BY id").fetchall():
+            for uid in rated_users(match_id, rater_id):
+                record_rating(uid, rating, db)
+        for mentor, mentor_id, rating in db.execute("SELECT mentor, mentor_id, rating FROM ratings").fetchall():
+            uid = mentor_id if mentor_id is not None else user_id_for_name(mentor, db)
+            if uid is not None: record_rating(uid, rating, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+if __name__ == "__main__":
+    # python -m mentor_stats   (one-off backfill after adding the table)
+    from database import init_db
+    init_db()
+    rebuild()
+    n = conn.execute("SELECT COUNT(*) FROM mentor_stats").fetchone()[0]
+    print(f"mentor_stats rebuilt for {n} users")
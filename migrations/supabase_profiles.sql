@@ -0,0 +1,11 @@
+-- Supabase schema used by sahay.py on top of the base profiles table.
+-- Safe to re-run: paste into the Supabase SQL editor (or psql) once per project.
+
+-- Match fields pre-tokenized by save_profile (sahay.profile_tokens)
+alter table profiles add column if not exists language_mask int8;
+alter table profiles add column if not exists subject_mask int8;
+alter table profiles add column if not exists grade_num int4;
+alter table profiles add column if not exists topic_key text;
+
+-- The expiry sweep (sahay.delete_stale_batch) reads waiting rows oldest first
+create index if not exists profiles_status_created_at on profiles (status, created_at);
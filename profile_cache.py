@@ -0,0 +1,49 @@
+import threading
+from database import connect
+
+# =========================================================
+# PROFILES VERSION
+# =========================================================
+# The profiles row of table_versions, which triggers on profiles bump on
+# every insert, update and delete (database.init_db). Writes from any
+# connection or process move it, and commits to other tables don't. Read
+# from one dedicated connection: a primary-key lookup per check.
+class ProfilesVersion:
+    def __init__(self, connect=connect):
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._probe = None
+
+    def current(self):
+        with self._lock:
+            if self._probe is None: self._probe = self._connect()
+            return self._probe.execute("SELECT version FROM table_versions WHERE name='profiles'").fetchone()[0]
+
+profiles_version = ProfilesVersion()
+
+# =========================================================
+# VERSIONED CACHE
+# =========================================================
+class VersionedCache:
+    """`loader()` result, reloaded only when the profiles version has moved."""
+
+    def __init__(self, loader, version=profiles_version):
+        self._loader = loader
+        self._profiles_version = version
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+        self.loads = 0
+
+    def get(self):
+        version = self._profiles_version.current()
+        with self._lock:
+            if version != self._version:
+                self._value = self._loader()
+                self._version = version
+                self.loads += 1
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
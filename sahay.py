@@ -1,8 +1,13 @@
 import streamlit as st
 from groq import Groq
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 import time
 from datetime import datetime, timedelta
+from subject_masks import encode_subjects, encode_languages, storable, SUBJECTS, LANGUAGES, TIME_SLOTS
+from topic_index import TopicIndex, topic_terms, topic_overlap, topic_points
+from ttl_sweeper import TTLSweeper
+from match_mailbox import MatchMailbox
 
 # =========================================================
 # 1. APP CONFIGURATION & STYLING
@@ -46,28 +51,57 @@ if "GROQ_API_KEY" in st.secrets:
 # 3. HELPER FUNCTIONS (NOW WITH CLEANUP)
 # =========================================================
 
-def cleanup_stale_data():
+# Profiles 'waiting' longer than this are offline/zombie users
+PROFILE_TTL = timedelta(hours=1)
+
+def stale_cutoff():
+    return (datetime.utcnow() - PROFILE_TTL).isoformat()
+
+def delete_stale_batch(limit, topics=None):
     """
-    Deletes profiles that have been 'waiting' for more than 1 hour.
-    This fixes the issue of matching with offline/zombie users.
+    Deletes up to `limit` profiles that have been 'waiting' for longer than
+    PROFILE_TTL, oldest first. Run by the sweeper, never by a search. Uses
+    the (status, created_at) index from migrations/supabase_profiles.sql.
     """
-    try:
-        # Calculate time 1 hour ago
-        one_hour_ago = (datetime.utcnow() - timedelta(hours=1)).isoformat()
-        
-        # Delete old waiting profiles
-        supabase.table("profiles").delete()\
+    cutoff = stale_cutoff()
+    rows = supabase.table("profiles").select("name")\
+        .eq("status", "waiting")\
+        .lt("created_at", cutoff)\
+        .order("created_at")\
+        .limit(limit)\
+        .execute().data
+    names = [r["name"] for r in rows]
+    if names:
+        # Same cutoff on the delete: a user who re-saved under the same name
+        # since the select has a fresh created_at and is kept
+        deleted = supabase.table("profiles").delete()\
             .eq("status", "waiting")\
-            .lt("created_at", one_hour_ago)\
-            .execute()
-    except:
-        pass # Fail silently to not disrupt user
+            .lt("created_at", cutoff)\
+            .in_("name", names)\
+            .execute().data
+        names = [r["name"] for r in deleted]
+        for name in names:
+            if topics is not None: topics.remove(name)
+    return len(names)
+
+@st.cache_resource
+def get_sweeper():
+    """One expiry thread per server process (see ttl_sweeper.py)."""
+    topics = get_topic_index()
+
+    def delete_batch(limit):
+        # Also bounds the topic index: users matched or deleted elsewhere age out
+        topics.expire(PROFILE_TTL.total_seconds())
+        return delete_stale_batch(limit, topics)
+    return TTLSweeper(delete_batch, name="sahay-sweeper").start()
 
 def delete_user_data(user_name):
     """Deletes the specific user when they click End Session"""
     try:
         supabase.table("profiles").delete().eq("name", user_name).execute()
     except: pass
+    get_topic_index().remove(user_name)
+    get_mailbox().discard(user_name)
 
 def upload_file(file_obj, match_id):
     try:
@@ -78,74 +112,128 @@ def upload_file(file_obj, match_id):
         return supabase.storage.from_(bucket).get_public_url(file_path)
     except: return None
 
-def calculate_match_score(me, candidate):
+def parse_grade(grade):
+    try: return int(grade.split(" ")[1])
+    except: return None
+
+def profile_tokens(profile):
+    """
+    Pre-tokenized match fields, computed once in save_profile and stored
+    with the row. Rows saved before those columns existed are parsed here.
+    """
+    if profile.get('subject_mask') is None:
+        # extend: values outside the form options still match each other
+        profile['language_mask'] = encode_languages(profile.get('languages') or "", extend=True)
+        profile['subject_mask'] = encode_subjects(profile.get('subjects') or "", extend=True)
+        profile['grade_num'] = parse_grade(profile.get('grade'))
+        profile['topic_key'] = (profile.get('specific_topics') or "").lower()
+    return profile['language_mask'], profile['subject_mask'], profile['grade_num'], profile['topic_key']
+
+@st.cache_resource
+def get_topic_index():
+    """Trigram index over waiting users' specific_topics, keyed by name."""
+    return TopicIndex()
+
+NO_TOPIC_OVERLAP = (0, 1)
+
+def calculate_match_score(me, candidate, overlap=None):
     score = 0
-    my_lang = set(x.strip() for x in (me.get('languages') or "").split(',') if x.strip())
-    their_lang = set(x.strip() for x in (candidate.get('languages') or "").split(',') if x.strip())
-    
-    if not my_lang.intersection(their_lang): return 0
+    my_lang, my_subs, my_g, my_topic = profile_tokens(me)
+    their_lang, their_subs, their_g, their_topic = profile_tokens(candidate)
+
+    if not my_lang & their_lang: return 0
     score += 20 
 
-    my_subs = set(x.strip() for x in (me.get('subjects') or "").split(',') if x.strip())
-    their_subs = set(x.strip() for x in (candidate.get('subjects') or "").split(',') if x.strip())
-    if my_subs.intersection(their_subs): score += 40
+    if my_subs & their_subs: score += 40
     else: return 0
 
-    try:
-        my_g = int(me['grade'].split(" ")[1])
-        their_g = int(candidate['grade'].split(" ")[1])
+    # No role: no grade points (the original parse-in-try skipped them too)
+    if my_g is not None and their_g is not None and 'role' in me:
         diff = their_g - my_g
         if me['role'] == "Student":
             if diff > 0: score += 30
             elif diff == 0: score += 15
         else:
             if diff < 0: score += 30
-    except: pass 
 
-    my_topic = (me.get('specific_topics') or "").lower()
-    their_topic = (candidate.get('specific_topics') or "").lower()
-    if my_topic and their_topic and (my_topic in their_topic or their_topic in my_topic):
-        score += 25
+    # Graded topic overlap; find_best_match passes it in from the topic index
+    if overlap is None:
+        overlap = topic_overlap(topic_terms(my_topic), topic_terms(their_topic))
+    score += topic_points(25, overlap)
 
     return score
 
 def find_best_match(my_profile):
-    # 1. First, clean up zombie users from the DB
-    cleanup_stale_data()
-    
-    # 2. Then search for fresh candidates
+    # Read-only: expiry is the sweeper's job, the cutoff just hides rows it hasn't reached yet
     opposite = "Teacher" if my_profile['role'] == "Student" else "Student"
-    response = supabase.table("profiles").select("*").eq("role", opposite).eq("time_slot", my_profile['time_slot']).eq("status", "waiting").execute()
+    response = supabase.table("profiles").select("*").eq("role", opposite).eq("time_slot", my_profile['time_slot']).eq("status", "waiting").gte("created_at", stale_cutoff()).execute()
     candidates = response.data
     if not candidates: return None
 
+    # Profiles are indexed when saved; only rows saved by another server
+    # process (or before a restart) are indexed here, once
+    topics = get_topic_index()
+    for p in candidates:
+        if p['name'] not in topics: topics.add(p['name'], p.get('specific_topics'))
+    overlaps = topics.similar(my_profile.get('specific_topics'))
+
     best = None
     high_score = 0
     for p in candidates:
-        s = calculate_match_score(my_profile, p)
+        s = calculate_match_score(my_profile, p, overlaps.get(p['name'], NO_TOPIC_OVERLAP))
         if s > high_score:
             high_score = s
             best = p
     return best
 
+# Seconds between Supabase checks for matches booked by another server process
+REMOTE_MATCH_CHECK = 30
+# Seconds between runs of the waiting page's match check (each run long-polls
+# the mailbox for MAILBOX_WAIT of them; a post in between waits in the box)
+MATCH_CHECK_EVERY = 5
+
+@st.cache_resource
+def get_mailbox():
+    """Match notifications between sessions on this server (see match_mailbox.py)."""
+    return MatchMailbox()
+
 def check_if_matched_by_others(my_name):
+    """Fallback for matches the mailbox can't see (booked by another server process)."""
     try:
-        my_profile = supabase.table("profiles").select("*").eq("name", my_name).execute().data
-        if my_profile and my_profile[0]['status'] == 'matched':
-            match_rec = supabase.table("matches").select("*").eq("mentor", my_name).execute().data
-            if match_rec: return True, match_rec[0]['mentee'], match_rec[0]['match_id']
-            match_rec = supabase.table("matches").select("*").eq("mentee", my_name).execute().data
-            if match_rec: return True, match_rec[0]['mentor'], match_rec[0]['match_id']
+        my_profile = supabase.table("profiles").select("status").eq("name", my_name).execute().data
+        if not my_profile or my_profile[0]['status'] != 'matched': return False, None, None
+        # Two plain .eq queries: a name inside an .or_() filter string could inject conditions
+        match_rec = supabase.table("matches").select("*").eq("mentor", my_name).limit(1).execute().data \
+            or supabase.table("matches").select("*").eq("mentee", my_name).limit(1).execute().data
+        if match_rec:
+            partner = match_rec[0]['mentee'] if match_rec[0]['mentor'] == my_name else match_rec[0]['mentor']
+            return True, partner, match_rec[0]['match_id']
         return False, None, None
     except: return False, None, None
 
 def save_profile(data):
+    """
+    Saves the profile with its match fields pre-tokenized, into the
+    columns migrations/supabase_profiles.sql adds to the profiles table.
+    """
     data['subjects'] = ", ".join(data['subjects'])
     data['languages'] = ",".join(data['languages'])
+    tokens = dict(zip(('language_mask', 'subject_mask', 'grade_num', 'topic_key'), profile_tokens(dict(data))))
+    row = {**data, **tokens} if storable(tokens['language_mask']) and storable(tokens['subject_mask']) else data
     try:
-        supabase.table("profiles").insert(data).execute()
-        return True
-    except: return False
+        supabase.table("profiles").insert(row).execute()
+    except APIError:
+        # Token columns not migrated yet: save the plain row, matching parses it on read
+        if row is data: return False
+        try: supabase.table("profiles").insert(data).execute()
+        except Exception: return False
+    except Exception:
+        return False
+    data.update(tokens)
+    get_topic_index().add(data['name'], data.get('specific_topics'))
+    # A new waiting spell: drop any notice left from an earlier match
+    get_mailbox().discard(data['name'])
+    return True
 
 def create_match_record(p1, p2):
     names = sorted([p1, p2])
@@ -156,14 +244,42 @@ def create_match_record(p1, p2):
             supabase.table("matches").insert({ "match_id": m_id, "mentor": p1, "mentee": p2 }).execute()
             supabase.table("profiles").update({"status": "matched"}).eq("name", p1).execute()
             supabase.table("profiles").update({"status": "matched"}).eq("name", p2).execute()
+            # Both sides: p1 may also be waiting in another session
+            get_mailbox().post(p1, (p2, m_id))
+            get_mailbox().post(p2, (p1, m_id))
     except: pass
+    get_topic_index().remove(p1)
+    get_topic_index().remove(p2)
     return m_id
 
+@st.fragment(run_every=MATCH_CHECK_EVERY)
+def wait_for_match():
+    """
+    Passive match check on the waiting page. Runs as a fragment, so only
+    this re-executes every MATCH_CHECK_EVERY seconds; the whole page reruns
+    only once a match has arrived. Long-polls the mailbox, and Supabase
+    every REMOTE_MATCH_CHECK seconds.
+    """
+    notice = get_mailbox().wait(st.session_state.user_name)
+    if notice is None and time.time() - st.session_state.get("last_match_check", 0) >= REMOTE_MATCH_CHECK:
+        st.session_state.last_match_check = time.time()
+        is_matched, partner, m_id = check_if_matched_by_others(st.session_state.user_name)
+        if is_matched: notice = (partner, m_id)
+    if notice:
+        partner, m_id = notice
+        st.success(f"🎉 You have been matched with **{partner}**!")
+        st.session_state.match_id = m_id
+        st.session_state.partner_name = partner
+        time.sleep(1.5)
+        st.session_state.stage = 3
+        st.rerun()
+
 # =========================================================
 # 4. MAIN APP LOGIC
 # =========================================================
 if "stage" not in st.session_state: st.session_state.stage = 1
 if "user_name" not in st.session_state: st.session_state.user_name = ""
+get_sweeper()
 
 st.markdown("<h1>🎓 Sahay <span style='font-size: 20px; color: #666;'>| Peer Learning Ecosystem</span></h1>", unsafe_allow_html=True)
 
@@ -179,15 +295,15 @@ if st.session_state.stage == 1:
                 role = st.radio("I want to:", ["Learn (Student)", "Teach (Mentor)"], horizontal=True)
                 role_str = "Student" if "Learn" in role else "Teacher"
                 name = st.text_input("My Full Name", placeholder="e.g. Rahul Sharma")
-                languages = st.multiselect("Languages I speak", ["English", "Hindi", "Marathi", "Tamil", "Bengali", "Telugu"])
+                languages = st.multiselect("Languages I speak", LANGUAGES)
             with col2:
                 grade = st.selectbox("Current Grade", [f"Grade {i}" for i in range(1, 13)])
-                time_slot = st.selectbox("Preferred Time", ["4-5 PM", "5-6 PM", "6-7 PM"])
+                time_slot = st.selectbox("Preferred Time", TIME_SLOTS)
             
             st.divider()
             c1, c2 = st.columns(2)
             with c1:
-                subjects = st.multiselect("Subjects", ["Mathematics", "Science", "English", "History", "Physics", "Chemistry"])
+                subjects = st.multiselect("Subjects", SUBJECTS)
             with c2:
                 topics = st.text_input("Specific Topic Focus", placeholder="e.g. Algebra, Thermodynamics, Grammar")
 
@@ -231,17 +347,8 @@ elif st.session_state.stage == 2:
             else:
                 st.warning("⏳ No perfect match yet.")
 
-        # Passive Match Check
-        is_matched, partner, m_id = check_if_matched_by_others(st.session_state.user_name)
-        if is_matched:
-            st.success(f"🎉 You have been matched with **{partner}**!")
-            st.session_state.match_id = m_id
-            st.session_state.partner_name = partner
-            time.sleep(1.5)
-            st.session_state.stage = 3
-            st.rerun()
-            
-        st.caption("Tip: If you are waiting, click the Search button occasionally to refresh.")
+        st.caption("Tip: This page keeps checking for you; click Search to look again yourself.")
+        wait_for_match()
 
 # --- STAGE 3: CHAT ---
 elif st.session_state.stage == 3:
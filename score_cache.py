@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+# Default number of pair scores kept before the least recently used is
+# evicted. Size 0 is off: matching.py's cache starts that way, and
+# cached_score then calls score directly.
+PAIR_CACHE_SIZE = 100_000
+
+# =========================================================
+# PAIR SCORE CACHE
+# =========================================================
+class PairScoreCache:
+    """
+    LRU cache of score(a, b) keyed on (user_a, version_a, user_b, version_b).
+    A profile save bumps profiles.profile_version, so edited profiles miss
+    and their old entries simply age out. With symmetric=True (score(a, b)
+    == score(b, a)) both orders share one entry. Hit/miss/eviction counters
+    are kept for the admin page.
+    """
+
+    def __init__(self, score_fn, maxsize=PAIR_CACHE_SIZE, symmetric=False):
+        self.score_fn = score_fn
+        self.maxsize = maxsize
+        self.symmetric = symmetric
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def score(self, a, b):
+        ka, kb = (a["user_id"], a.get("version", 0)), (b["user_id"], b.get("version", 0))
+        key = kb + ka if self.symmetric and kb < ka else ka + kb
+        with self._lock:
+            s = self._data.get(key)
+            if s is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return s
+            self.misses += 1
+        s = self.score_fn(a, b)
+        with self._lock:
+            self._data[key] = s
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return s
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,207 @@
+import threading
+from subject_masks import SUBJECT_BITS
+from topic_index import topic_terms, topic_overlap, topic_points
+
+# =========================================================
+# WEIGHT TABLES FOR EVERY SCORER VARIANT
+# =========================================================
+# source:            how subjects are read off a profile
+#                      "masks"   -> matching.load_profiles (strong_mask / weak_mask)
+#                      "lists"   -> app2/app4/app5/app6 (subject lists)
+#                      "strings" -> app.py / sahay.py (comma strings, languages, topics)
+# mentor_subjects:   which list a mentor is scored on ("teaches" first or "strong" first)
+# complementary:     points per mentee weak subject the mentor covers
+# symmetric:         also score the other direction (peer matching)
+# practice:          points per mentee strong subject the mentor also covers
+# language_gate:     points for a shared language, 0 overall without one
+# subject_gate:      points for a shared subject, 0 overall without one
+# grade_direction:   (student & partner older, student & same grade, teacher & partner younger)
+# topic:             points for matching specific_topics
+# topic_match:       "substring" (all or nothing) or "trigram" (graded, see topic_index.py)
+VARIANTS = {
+    "matching": {"source": "masks", "complementary": 25, "symmetric": True,
+                 "same_grade": 10, "same_time": 10},
+    "app6": {"source": "lists", "mentor_subjects": "teaches", "complementary": 50,
+             "same_time": 20, "same_grade": 10},
+    "app4": {"source": "lists", "mentor_subjects": "strong", "complementary": 50,
+             "same_time": 20, "same_grade": 10, "practice": 5},
+    "sahay": {"source": "strings", "language_gate": 20, "subject_gate": 40,
+              "grade_direction": (30, 15, 30), "topic": 25, "topic_match": "trigram"},
+    "app": {"source": "strings", "language_gate": 20, "subject_gate": 40,
+            "grade_direction": (30, 15, 30), "topic": 25, "topic_match": "substring"},
+}
+VARIANTS["app2"] = VARIANTS["app5"] = VARIANTS["app4"]
+
+# Compiled profile layout (plain tuples, read by index in the kernel)
+WEAK, STRONG, MENTOR, TIME, GRADE, GRADE_NUM, ROLE, LANGS, SUBJECTS, TOPIC = range(10)
+
+# =========================================================
+# KERNEL
+# =========================================================
+class ScoringKernel:
+    """
+    Compiles a weight table into a specialised score(a, b) over compiled
+    profiles. Profiles are parsed once by compile(); the kernel itself only
+    does integer AND/popcount, code comparisons and table lookups, and has
+    the weights inlined as constants.
+
+    For the mentor/mentee variants `a` is the mentee and `b` the mentor;
+    for "sahay" `a` is the searching user ("me") and `b` the candidate.
+    """
+
+    def __init__(self, variant):
+        self.variant = variant
+        self.weights = VARIANTS[variant]
+        self.vocab = dict(SUBJECT_BITS)
+        self._codes = {}
+        self._lock = threading.Lock()
+        self.score = self._build()
+
+    # ---------- profile compilation ----------
+    def _mask(self, items):
+        mask = 0
+        for s in items:
+            bit = self.vocab.get(s)
+            if bit is None:
+                with self._lock:
+                    bit = self.vocab.setdefault(s, 1 << len(self.vocab))
+            mask |= bit
+        return mask
+
+    def _tokens(self, text):
+        return self._mask({x.strip() for x in (text or "").split(",") if x.strip()})
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.setdefault(value, len(self._codes))
+        return code
+
+    def compile(self, u):
+        w = self.weights
+        weak = strong = mentor = langs = subjects = 0
+        grade_num = role = topic = None
+        time = grade = -1
+
+        if w["source"] == "masks":
+            weak, mentor = u["weak_mask"], u["strong_mask"]
+        elif w["source"] == "lists":
+            weak = self._mask(u.get("weak_subjects", []))
+            strong = self._mask(u.get("strong_subjects", []))
+            if w["mentor_subjects"] == "teaches":
+                mentor = self._mask(u.get("teaches", u.get("strong_subjects", [])))
+            else:
+                mentor = self._mask(u.get("strong_subjects", u.get("teaches", [])))
+        else:
+            langs = self._tokens(u.get("languages"))
+            subjects = self._tokens(u.get("subjects"))
+            try:
+                grade_num = int(u["grade"].split(" ")[1])
+            except Exception:
+                pass
+            role = None if "role" not in u else (0 if u["role"] == "Student" else 1)
+            topic = (u.get("specific_topics") or "").lower()
+            if w["topic_match"] == "trigram": topic = topic_terms(topic)
+
+        if "same_time" in w: time = self._code(u["time"])
+        if "same_grade" in w: grade = self._code(u["grade"])
+        return (weak, strong, mentor, time, grade, grade_num, role, langs, subjects, topic)
+
+    # ---------- code generation ----------
+    def _build(self):
+        w = self.weights
+        lines = ["def score(a, b):", "    s = 0"]
+        if "language_gate" in w:
+            lines += [f"    if not (a[{LANGS}] & b[{LANGS}]): return 0",
+                      f"    s += {w['language_gate']}"]
+        if "subject_gate" in w:
+            lines += [f"    if not (a[{SUBJECTS}] & b[{SUBJECTS}]): return 0",
+                      f"    s += {w['subject_gate']}"]
+        if "complementary" in w:
+            term = f"(a[{WEAK}] & b[{MENTOR}]).bit_count()"
+            if w.get("symmetric"):
+                term = f"({term} + (b[{WEAK}] & a[{MENTOR}]).bit_count())"
+            lines.append(f"    s += {term} * {w['complementary']}")
+        if "same_grade" in w:
+            lines.append(f"    if a[{GRADE}] == b[{GRADE}]: s += {w['same_grade']}")
+        if "same_time" in w:
+            lines.append(f"    if a[{TIME}] == b[{TIME}]: s += {w['same_time']}")
+        if "practice" in w:
+            lines.append(f"    s += (a[{STRONG}] & b[{MENTOR}]).bit_count() * {w['practice']}")
+        if "grade_direction" in w:
+            up, same, down = w["grade_direction"]
+            # GRADE_DIR[role][sign(diff) + 1], role 0 = Student, 1 = anyone else
+            lines += [f"    if a[{ROLE}] is not None and a[{GRADE_NUM}] is not None and b[{GRADE_NUM}] is not None:",
+                      f"        d = b[{GRADE_NUM}] - a[{GRADE_NUM}]",
+                      f"        s += GRADE_DIR[a[{ROLE}]][(d > 0) - (d < 0) + 1]"]
+            grade_dir = ((0, same, up), (down, 0, 0))
+        else:
+            grade_dir = None
+        if "topic" in w and w["topic_match"] == "trigram":
+            lines.append(f"    s += topic_points({w['topic']}, topic_overlap(a[{TOPIC}], b[{TOPIC}]))")
+        elif "topic" in w:
+            lines += [f"    ta, tb = a[{TOPIC}], b[{TOPIC}]",
+                      f"    if ta and tb and (ta in tb or tb in ta): s += {w['topic']}"]
+        lines.append("    return s")
+
+        ns = {"GRADE_DIR": grade_dir, "topic_overlap": topic_overlap, "topic_points": topic_points}
+        exec(compile("\n".join(lines), f"<scoring_kernel:{self.variant}>", "exec"), ns)
+        return ns["score"]
+
+    def best(self, me, candidates):
+        """Index and score of the first highest-scoring compiled candidate."""
+        best, high = -1, 0
+        score = self.score
+        for i, c in enumerate(candidates):
+            s = score(me, c)
+            if s > high: best, high = i, s
+        return best, high
+
+_kernels = {}
+_kernels_lock = threading.Lock()
+
+def get_kernel(variant):
+    """Shared kernel per variant, so compiled profiles use one vocabulary."""
+    kernel = _kernels.get(variant)
+    if kernel is None:
+        with _kernels_lock:
+            kernel = _kernels.get(variant)
+            if kernel is None:
+                kernel = _kernels[variant] = ScoringKernel(variant)
+    return kernel
+
+# =========================================================
+# COMPILED POOL
+# =========================================================
+class CompiledPool:
+    """
+    Profiles compiled once for a kernel, then searched many times: the
+    apps build one whenever their shared mentor pool changes, so a search
+    compiles only the searching user.
+    """
+
+    def __init__(self, variant, profiles):
+        self.kernel = get_kernel(variant)
+        self.profiles = tuple(profiles)
+        self.compiled = [self.kernel.compile(p) for p in self.profiles]
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def __iter__(self):
+        return iter(self.profiles)
+
+    def best(self, me, exclude_name=None):
+        """
+        (profile, score) of the first highest-scoring profile other than
+        `exclude_name`. Zero scores count, as in the apps' find_best_mentor
+        loops; (None, -1) when nothing is eligible.
+        """
+        score, cme = self.kernel.score, self.kernel.compile(me)
+        best, high = None, -1
+        for p, c in zip(self.profiles, self.compiled):
+            if p["name"] == exclude_name: continue
+            s = score(cme, c)
+            if s > high: best, high = p, s
+        return best, high
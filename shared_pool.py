@@ -0,0 +1,94 @@
+import threading
+import time
+import streamlit as st
+from scoring_kernel import CompiledPool
+
+# Seconds a registered profile stays in the pool if it is never matched or removed
+POOL_TTL = 60 * 60
+
+# =========================================================
+# SHARED IN-MEMORY POOL (app2 / app4 / app5)
+# =========================================================
+class SharedProfilePool:
+    """
+    Mentors and mentees registered by every browser session of the
+    in-memory demo apps, so sessions can match each other and each
+    profile is held once per process instead of once per session.
+    Keyed by name: submitting a profile again replaces the old entry.
+    Matched and ended sessions remove their names; anything else expires
+    after POOL_TTL, checked on each register. Reads return an immutable
+    snapshot rebuilt only after a write.
+    """
+
+    def __init__(self, variant="app4"):
+        # app2, app4 and app5 all score with the "app4" weights
+        self.variant = variant
+        self._lock = threading.Lock()
+        self._mentors = {}
+        self._mentees = {}
+        self._added = {}
+        self._snapshots = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._mentors.keys() | self._mentees.keys())
+
+    def register(self, profile, mentor=False, mentee=False):
+        name = profile["name"]
+        with self._lock:
+            self._expire(POOL_TTL)
+            self._drop(name)
+            if mentor: self._mentors[name] = profile
+            if mentee: self._mentees[name] = profile
+            self._added[name] = time.time()
+            self._snapshots.clear()
+
+    def remove(self, *names):
+        """Take `names` out of the pool: both sides of a match, or an ended session."""
+        with self._lock:
+            for name in names:
+                self._drop(name)
+            self._snapshots.clear()
+
+    def expire(self, max_age=POOL_TTL):
+        """Remove profiles registered more than `max_age` seconds ago; returns how many."""
+        with self._lock:
+            return self._expire(max_age)
+
+    def _expire(self, max_age):
+        cutoff = time.time() - max_age
+        old = [name for name, t in self._added.items() if t < cutoff]
+        for name in old:
+            self._drop(name)
+        if old: self._snapshots.clear()
+        return len(old)
+
+    def _drop(self, name):
+        self._mentors.pop(name, None)
+        self._mentees.pop(name, None)
+        self._added.pop(name, None)
+
+    def _snapshot(self, kind, source):
+        with self._lock:
+            snap = self._snapshots.get(kind)
+            if snap is None:
+                snap = self._snapshots[kind] = tuple(source.values())
+            return snap
+
+    def mentors(self):
+        return self._snapshot("mentors", self._mentors)
+
+    def mentees(self):
+        return self._snapshot("mentees", self._mentees)
+
+    def mentor_pool(self):
+        """mentors() compiled for the scoring kernel, rebuilt only after a write."""
+        with self._lock:
+            pool = self._snapshots.get("mentor_pool")
+            if pool is None:
+                pool = self._snapshots["mentor_pool"] = CompiledPool(self.variant, self._mentors.values())
+            return pool
+
+@st.cache_resource
+def get_shared_pool():
+    return SharedProfilePool()
@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+from background import BackgroundLoop
+
+log = logging.getLogger(__name__)
+
+# =========================================================
+# STORAGE PROFILE
+# =========================================================
+# Applied to every connection database.connect() opens. WAL lets readers
+# carry on while a commit is written (rollback journaling locks the whole
+# file for each commit), and with WAL synchronous=NORMAL fsyncs only at
+# checkpoints: a power cut can drop the last commits but not corrupt the file.
+JOURNAL_MODE = "WAL"
+SYNCHRONOUS = "NORMAL"
+# Database bytes read through mmap instead of read() calls
+MMAP_SIZE = 256 * 1024 * 1024
+# Page cache per connection, in KiB (negative cache_size means KiB)
+CACHE_SIZE_KB = 16 * 1024
+# Milliseconds a statement waits on another connection's lock
+BUSY_TIMEOUT_MS = 5000
+TEMP_STORE = "MEMORY"
+# Commits only checkpoint on their own past this many WAL pages, a backstop
+# for when the checkpoint thread isn't running
+WAL_AUTOCHECKPOINT = 4000
+# Size the WAL file is cut back to after a checkpoint resets it
+JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+PRAGMAS = (
+    f"busy_timeout = {BUSY_TIMEOUT_MS}",
+    f"journal_mode = {JOURNAL_MODE}",
+    f"synchronous = {SYNCHRONOUS}",
+    f"mmap_size = {MMAP_SIZE}",
+    f"cache_size = {-CACHE_SIZE_KB}",
+    f"temp_store = {TEMP_STORE}",
+    f"wal_autocheckpoint = {WAL_AUTOCHECKPOINT}",
+    f"journal_size_limit = {JOURNAL_SIZE_LIMIT}",
+)
+
+def configure(db):
+    """Apply the storage profile to a new connection and return it."""
+    for pragma in PRAGMAS:
+        db.execute(f"PRAGMA {pragma}")
+    return db
+
+# =========================================================
+# CHECKPOINTER
+# =========================================================
+# Seconds between checkpoints, and the WAL size that triggers a truncating one
+CHECKPOINT_INTERVAL = 30
+WAL_MAX_BYTES = 64 * 1024 * 1024
+
+class Checkpointer(BackgroundLoop):
+    """
+    Keeps the WAL bounded off the request path. Every `interval` seconds a
+    PASSIVE checkpoint copies committed pages back into the database without
+    waiting on anyone. If the WAL file has still grown past `max_wal_bytes`
+    (a long read kept it pinned), a TRUNCATE checkpoint waits for readers
+    and shrinks it to zero. `connect()` opens the thread's own connection.
+    """
+
+    def __init__(self, connect, path, interval=CHECKPOINT_INTERVAL, max_wal_bytes=WAL_MAX_BYTES,
+                 name="checkpointer"):
+        super().__init__(interval, name)
+        self.connect = connect
+        self.path = path
+        self.max_wal_bytes = max_wal_bytes
+        self.runs = self.truncates = 0
+        self.last_pages, self.last_seconds = 0, 0.0
+        self._db = None
+
+    def wal_bytes(self):
+        try:
+            return os.path.getsize(self.path + "-wal")
+        except OSError:
+            return 0
+
+    def run_once(self):
+        if self._db is None: self._db = self.connect()
+        start = time.perf_counter()
+        size = self.wal_bytes()
+        mode = "TRUNCATE" if size > self.max_wal_bytes else "PASSIVE"
+        busy, wal_pages, done = self._db.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        elapsed = time.perf_counter() - start
+        self.runs += 1
+        self.last_pages, self.last_seconds = done, elapsed
+        if mode == "TRUNCATE":
+            self.truncates += 1
+            if busy:
+                log.warning("%s: WAL at %.1f MiB still pinned by readers after %.2fs",
+                            self.name, size / 2**20, elapsed)
+            else:
+                log.info("%s: WAL at %.1f MiB truncated in %.2fs", self.name, size / 2**20, elapsed)
+        return done, elapsed
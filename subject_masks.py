@@ -0,0 +1,68 @@
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+# =========================================================
+# SUBJECT BITMASKS
+# =========================================================
+# The profile-form options (sahay.py and app.py offer exactly these lists),
+# and the bit tables built from them. Bit positions follow list order and
+# are persisted in the *_mask columns, so only ever append.
+SUBJECTS = ["Mathematics", "English", "Science", "History", "Physics", "Chemistry"]
+LANGUAGES = ["English", "Hindi", "Marathi", "Tamil", "Bengali", "Telugu"]
+# Not masked, but ann_index one-hot encodes by position in this list
+TIME_SLOTS = ["4-5 PM", "5-6 PM", "6-7 PM"]
+
+SUBJECT_BITS = {s: 1 << i for i, s in enumerate(SUBJECTS)}
+LANGUAGE_BITS = {s: 1 << i for i, s in enumerate(LANGUAGES)}
+
+# Values outside the tables (older rows, data not entered through a form)
+# are logged once. With extend=True they get a bit from EXTRA_BIT up,
+# assigned per process, so such masks must never be stored.
+EXTRA_BIT = 32
+_extra_bits = {}
+_extra_lock = threading.Lock()
+
+def _unknown(kind, value, extend):
+    key = (kind, value)
+    bit = _extra_bits.get(key)
+    if bit is None:
+        with _extra_lock:
+            bit = _extra_bits.get(key)
+            if bit is None:
+                bit = _extra_bits[key] = 1 << (EXTRA_BIT + len(_extra_bits))
+                log.warning("%s %r is not in subject_masks.%sS", kind, value, kind.upper())
+    return bit if extend else 0
+
+def _encode(items, bits, kind, extend):
+    if isinstance(items, str):
+        items = items.split(",")
+    mask = 0
+    for s in items or []:
+        s = s.strip()
+        if not s: continue
+        bit = bits.get(s)
+        mask |= _unknown(kind, s, extend) if bit is None else bit
+    return mask
+
+def encode_subjects(subjects, extend=False):
+    """Encode a list (or comma string) of subjects as an integer bitmask."""
+    return _encode(subjects, SUBJECT_BITS, "subject", extend)
+
+def encode_languages(languages, extend=False):
+    """Encode a list (or comma string) of languages as an integer bitmask."""
+    return _encode(languages, LANGUAGE_BITS, "language", extend)
+
+def storable(mask):
+    """False if the mask holds process-local bits (see extend above)."""
+    return mask is None or mask < (1 << EXTRA_BIT)
+
+def decode_subjects(mask):
+    return [s for s, bit in SUBJECT_BITS.items() if mask & bit]
+
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
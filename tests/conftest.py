@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connect, init_db
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A temporary database with the app schema; app.db is never touched."""
+    path = str(tmp_path / "app.db")
+    db = connect(path)
+    init_db(db)
+    db.close()
+    return path
@@ -0,0 +1,35 @@
+import itertools
+import random
+
+import numpy as np
+
+from ann_index import embed, DIM, _G, _T, _MAX_NORM
+from batch_scoring import SUBJECT_WEIGHT
+from benchmarks.legacy import load_functions
+from subject_masks import TIME_SLOTS
+
+# The production matching.score, loaded without importing streamlit
+score, = load_functions("matching.py", "score")
+
+def inner(a, b):
+    """y(a) . x(b) with the query normalisation and item scaling undone."""
+    q = embed(a, query=True)[:DIM]
+    norm = np.sqrt(a["weak_mask"].bit_count() + a["strong_mask"].bit_count()
+                   + _G ** 2 + (_T ** 2 if a["time"] in TIME_SLOTS else 0))
+    return float(q @ embed(b)[:DIM]) * norm * _MAX_NORM
+
+def test_time_slots_never_collide():
+    rng = random.Random(0)
+    for ta, tb in itertools.product(TIME_SLOTS, repeat=2):
+        for _ in range(20):
+            a = {"user_id": 1, "grade": f"Grade {rng.randint(1, 10)}", "time": ta,
+                 "strong_mask": rng.getrandbits(6), "weak_mask": rng.getrandbits(6)}
+            b = {"user_id": 2, "grade": f"Grade {rng.randint(1, 10)}", "time": tb,
+                 "strong_mask": rng.getrandbits(6), "weak_mask": rng.getrandbits(6)}
+            assert np.isclose(inner(a, b), score(a, b) / SUBJECT_WEIGHT, atol=1e-5), (ta, tb)
+
+def test_unknown_time_gets_no_slot():
+    a = {"user_id": 1, "grade": "Grade 5", "time": "7-8 PM", "strong_mask": 0, "weak_mask": 1}
+    b = dict(a, user_id=2, strong_mask=1, weak_mask=0)
+    # Scored as if the times differed
+    assert np.isclose(inner(a, b), score(a, dict(b, time="8-9 PM")) / SUBJECT_WEIGHT, atol=1e-5)
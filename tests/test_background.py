@@ -0,0 +1,39 @@
+import logging
+import threading
+
+from database import connect
+from storage import Checkpointer
+from ttl_sweeper import TTLSweeper
+
+def test_sweep_repeats_batches_until_one_comes_back_short():
+    left = [12]
+    def delete_batch(limit):
+        n = min(limit, left[0])
+        left[0] -= n
+        return n
+    sweeper = TTLSweeper(delete_batch, batch=5)
+    assert sweeper.run_once()[0] == 12
+    assert sweeper.total_deleted == 12 and sweeper.runs == 1
+
+def test_failures_are_logged_and_the_loop_carries_on(caplog):
+    calls, done = [], threading.Event()
+    def delete_batch(limit):
+        calls.append(limit)
+        if len(calls) == 1: raise RuntimeError("supabase down")
+        done.set()
+        return 0
+    with caplog.at_level(logging.ERROR, logger="background"):
+        sweeper = TTLSweeper(delete_batch, interval=0.01, name="test-sweeper").start()
+        assert done.wait(5)
+        sweeper.stop()
+    assert "test-sweeper failed" in caplog.text
+    assert "supabase down" in caplog.text
+
+def test_checkpointer_runs_on_its_own_connection(db_path):
+    db = connect(db_path)
+    db.execute("CREATE TABLE t (x)")
+    db.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+    db.commit()
+    checkpointer = Checkpointer(lambda: connect(db_path), db_path)
+    done, _ = checkpointer.run_once()
+    assert done >= 0 and checkpointer.runs == 1
@@ -0,0 +1,30 @@
+import gc
+import sys
+import threading
+
+from database import ConnectionPool
+
+def in_thread(fn):
+    out = {}
+    def run():
+        try: out["value"] = fn()
+        except Exception as e: out["error"] = type(e)
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    return out
+
+def test_pool_timeout_raises_cleanly_and_keeps_its_slots(db_path, monkeypatch):
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    pool = ConnectionPool(db_path, size=1, timeout=0.05)
+    pool.cursor()  # this thread holds the only connection
+
+    # The half-built lease is dropped with the thread: its __del__ must not fail
+    assert in_thread(lambda: pool.cursor()) == {"error": TimeoutError}
+    gc.collect()
+    assert unraisable == []
+
+    pool.release()
+    assert in_thread(lambda: pool.cursor().execute("SELECT 1").fetchone()) == {"value": (1,)}
+    assert pool.opened == 1
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("streamlit")
+from database import connect
+from matching import reserve_group, reserve_pair, release_session
+
+TEACHER, A, B, C = 1, 2, 3, 4
+GROUP = "g1-2-3-4"
+
+@pytest.fixture
+def db(db_path):
+    db = connect(db_path)
+    db.executemany("INSERT INTO profiles (user_id, role) VALUES (?, ?)",
+                   [(TEACHER, "Teacher"), (A, "Student"), (B, "Student"), (C, "Student")])
+    db.commit()
+    return db
+
+def statuses(db):
+    return dict(db.execute("SELECT user_id, status FROM profiles ORDER BY user_id"))
+
+def leave(db, match_id, user_id):
+    with db:
+        return release_session(db.cursor(), match_id, user_id)
+
+def test_group_mentees_leave_one_at_a_time(db):
+    assert reserve_group([TEACHER, A, B, C], GROUP, db)
+    assert leave(db, GROUP, A) == [A]
+    assert statuses(db) == {TEACHER: "matched", A: "waiting", B: "matched", C: "matched"}
+    # The Teacher can't be booked again while the group runs
+    assert not reserve_pair(A, TEACHER, "2-1", db)
+    assert leave(db, GROUP, B) == [B]
+    assert statuses(db)[TEACHER] == "matched"
+    # The last mentee frees the Teacher too
+    assert sorted(leave(db, GROUP, C)) == [TEACHER, C]
+    assert set(statuses(db).values()) == {"waiting"}
+
+def test_teacher_ending_frees_the_whole_group(db):
+    assert reserve_group([TEACHER, A, B, C], GROUP, db)
+    assert sorted(leave(db, GROUP, TEACHER)) == [TEACHER, A, B, C]
+    assert set(statuses(db).values()) == {"waiting"}
+
+def test_pair_session_frees_both(db):
+    assert reserve_pair(A, B, "2-3", db)
+    assert sorted(leave(db, "2-3", A)) == [A, B]
+    assert leave(db, "2-3", B) == []
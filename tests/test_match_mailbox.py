@@ -0,0 +1,22 @@
+import threading
+
+from match_mailbox import MatchMailbox
+
+def test_post_wakes_each_waiting_side():
+    box, got = MatchMailbox(), {}
+    def waiter(name):
+        got[name] = box.wait(name, timeout=5)
+    threads = [threading.Thread(target=waiter, args=(n,)) for n in ("asha", "ravi")]
+    for t in threads: t.start()
+    box.post("asha", ("ravi", "asha-ravi"))
+    box.post("ravi", ("asha", "asha-ravi"))
+    for t in threads: t.join()
+    assert got == {"asha": ("ravi", "asha-ravi"), "ravi": ("asha", "asha-ravi")}
+
+def test_post_before_wait_is_kept_and_discard_drops_it():
+    box = MatchMailbox()
+    box.post("asha", ("ravi", "asha-ravi"))
+    assert box.wait("asha", timeout=0) == ("ravi", "asha-ravi")
+    box.post("asha", ("ravi", "asha-ravi"))
+    box.discard("asha")
+    assert box.wait("asha", timeout=0) is None
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("streamlit")
+import match_worker
+from database import connect
+from profile_cache import ProfilesVersion
+
+class Stop(Exception):
+    pass
+
+def test_worker_reruns_on_profile_writes_not_other_commits(db_path, monkeypatch):
+    db = connect(db_path)
+    writes = iter([
+        "INSERT INTO messages (match_id, sender, message) VALUES ('m1', 'a', 'hi')",
+        "INSERT INTO match_proposals (match_id, user_a, user_b, score) VALUES ('1-2', 1, 2, 50)",
+        "INSERT INTO profiles (user_id, role) VALUES (1, 'Teacher')",
+        "INSERT INTO messages (match_id, sender, message) VALUES ('m1', 'b', 'hello')",
+    ])
+    runs = []
+
+    def sleep(_):
+        sql = next(writes, None)
+        if sql is None: raise Stop
+        db.execute(sql)
+        db.commit()
+
+    monkeypatch.setattr(match_worker, "profiles_version", ProfilesVersion(lambda: connect(db_path)))
+    monkeypatch.setattr(match_worker, "run_once", lambda *args: runs.append(args))
+    monkeypatch.setattr(match_worker.time, "sleep", sleep)
+    with pytest.raises(Stop):
+        match_worker.run_worker(interval=3600, poll=0)
+    # The first tick, then one for the profiles insert only
+    assert len(runs) == 2
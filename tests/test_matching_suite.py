@@ -0,0 +1,9 @@
+import pytest
+
+pytest.importorskip("streamlit")
+from benchmarks.matching_suite import run, build_scorers
+from benchmarks.synthetic import generate_profiles
+
+def test_every_scorer_runs_on_a_small_pool(capsys):
+    results = run([200], 3, 0)
+    assert {r["scorer"] for r in results} == set(build_scorers(generate_profiles(10, 0)))
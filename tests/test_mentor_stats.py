@@ -0,0 +1,24 @@
+from database import connect
+from mentor_stats import rebuild, user_id_for_name
+
+def stats(db):
+    return dict(db.execute("SELECT user_id, rating_count FROM mentor_stats"))
+
+def test_ratings_credit_the_rated_mentor_id_not_the_name(db_path):
+    db = connect(db_path)
+    db.executemany("INSERT INTO auth_users (id, name, email) VALUES (?, ?, ?)",
+                   [(1, "Priya", "p1@x"), (2, "Priya", "p2@x"), (3, "Arjun", "a@x")])
+    db.executemany("INSERT INTO ratings (mentor, mentor_id, mentee, rating) VALUES (?, ?, 'Ravi', ?)",
+                   [("Priya", 2, 5), ("Priya", None, 4), ("Arjun", None, 3)])
+    db.commit()
+    rebuild(db)
+    # The id-carrying rating goes to user 2; the name-only one is ambiguous and skipped
+    assert stats(db) == {2: 1, 3: 1}
+
+def test_ambiguous_or_unknown_names_have_no_id(db_path):
+    db = connect(db_path)
+    db.executemany("INSERT INTO auth_users (id, name, email) VALUES (?, ?, ?)",
+                   [(1, "Priya", "p1@x"), (2, "Priya", "p2@x"), (3, "Arjun", "a@x")])
+    assert user_id_for_name("Arjun", db) == 3
+    assert user_id_for_name("Priya", db) is None
+    assert user_id_for_name("Nobody", db) is None
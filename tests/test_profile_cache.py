@@ -0,0 +1,29 @@
+from database import connect
+from profile_cache import ProfilesVersion, VersionedCache
+
+def test_reloads_on_profiles_writes_only(db_path):
+    cache = VersionedCache(lambda: object(), ProfilesVersion(lambda: connect(db_path)))
+    db = connect(db_path)
+    first = cache.get()
+    assert cache.get() is first and cache.loads == 1
+
+    db.execute("INSERT INTO messages (match_id, sender, message) VALUES ('m1', 'a', 'hi')")
+    db.commit()
+    assert cache.get() is first
+
+    for sql in ("INSERT INTO profiles (user_id, role) VALUES (1, 'Teacher')",
+                "UPDATE profiles SET status='matched' WHERE user_id=1",
+                "DELETE FROM profiles WHERE user_id=1"):
+        db.execute(sql)
+        db.commit()
+        cache.get()
+    assert cache.loads == 4
+
+def test_uncommitted_writes_do_not_reload(db_path):
+    cache = VersionedCache(lambda: object(), ProfilesVersion(lambda: connect(db_path)))
+    cache.get()
+    db = connect(db_path)
+    db.execute("INSERT INTO profiles (user_id, role) VALUES (1, 'Teacher')")
+    cache.get()
+    db.rollback()
+    assert cache.get() and cache.loads == 1
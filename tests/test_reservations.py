@@ -0,0 +1,73 @@
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from database import connect
+from matching import reserve_pair, reserve_group
+
+def seed_pool(path, n):
+    db = connect(path)
+    db.executemany(
+        "INSERT INTO profiles (user_id, role, grade, time, status) VALUES (?, 'Student', 'Grade 5', '4-5 PM', 'waiting')",
+        [(i,) for i in range(1, n + 1)]
+    )
+    db.commit()
+    db.close()
+
+def statuses(path):
+    db = connect(path)
+    rows = db.execute("SELECT user_id, status, match_id FROM profiles").fetchall()
+    db.close()
+    return rows
+
+def test_concurrent_reservations_never_double_book(db_path):
+    n_users, n_threads, attempts = 60, 16, 100
+    seed_pool(db_path, n_users)
+    won = []
+
+    def worker(seed):
+        db = connect(db_path)
+        rng = random.Random(seed)
+        wins = 0
+        for _ in range(attempts):
+            a, b = rng.sample(range(1, n_users + 1), 2)
+            wins += reserve_pair(a, b, f"t{seed}-{a}-{b}", db)
+        db.close()
+        won.append(wins)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    per_match = Counter(m for _, status, m in statuses(db_path) if status == "matched")
+    assert all(c == 2 for c in per_match.values())
+    assert len(per_match) == sum(won)
+
+def test_conflict_keeps_the_callers_transaction(db_path):
+    seed_pool(db_path, 3)
+    db = connect(db_path)
+    assert reserve_pair(1, 2, "1-2", db)
+
+    db.execute("INSERT INTO messages (match_id, sender, message) VALUES ('x', 'a', 'kept')")
+    assert db.in_transaction
+    # 2 is taken: only the reservation is undone, the open transaction survives
+    assert not reserve_group([2, 3], "2-3", db)
+    assert db.in_transaction
+    assert reserve_group([3], "solo", db)
+    db.commit()
+
+    assert db.execute("SELECT message FROM messages").fetchall() == [("kept",)]
+    assert dict((u, m) for u, _, m in statuses(db_path)) == {1: "1-2", 2: "1-2", 3: "solo"}
+    db.close()
+
+def test_conflict_rolls_back_a_whole_group(db_path):
+    seed_pool(db_path, 4)
+    db = connect(db_path)
+    assert reserve_pair(1, 2, "1-2", db)
+    assert not reserve_group([2, 3, 4], "g2-3-4", db)
+    assert {u: s for u, s, _ in statuses(db_path)} == {1: "matched", 2: "matched", 3: "waiting", 4: "waiting"}
+    db.close()
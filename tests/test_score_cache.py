@@ -0,0 +1,57 @@
+import pytest
+
+from score_cache import PairScoreCache, PAIR_CACHE_SIZE
+
+def counting_score():
+    calls = []
+    def score(a, b):
+        calls.append((a["user_id"], b["user_id"]))
+        return a["user_id"] * 10 + b["user_id"]
+    return score, calls
+
+def test_default_size_is_non_zero():
+    assert PairScoreCache(lambda a, b: 0).maxsize == PAIR_CACHE_SIZE > 0
+
+def test_hit_returns_cached_score_without_calling():
+    score, calls = counting_score()
+    cache = PairScoreCache(score)
+    a, b = {"user_id": 1}, {"user_id": 2}
+    assert cache.score(a, b) == 12
+    assert cache.score(a, b) == 12
+    assert calls == [(1, 2)]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_symmetric_orders_share_an_entry():
+    score, calls = counting_score()
+    cache = PairScoreCache(score, symmetric=True)
+    cache.score({"user_id": 1}, {"user_id": 2})
+    cache.score({"user_id": 2}, {"user_id": 1})
+    assert len(calls) == 1 and len(cache) == 1
+
+def test_version_bump_misses():
+    score, calls = counting_score()
+    cache = PairScoreCache(score)
+    cache.score({"user_id": 1, "version": 0}, {"user_id": 2})
+    cache.score({"user_id": 1, "version": 1}, {"user_id": 2})
+    assert len(calls) == 2
+
+def test_least_recently_used_is_evicted():
+    score, calls = counting_score()
+    cache = PairScoreCache(score, maxsize=2)
+    a, b, c, d = ({"user_id": i} for i in range(1, 5))
+    cache.score(a, b)
+    cache.score(a, c)
+    cache.score(a, b)  # hit, a-c is now the oldest
+    cache.score(a, d)
+    assert cache.evictions == 1
+    cache.score(a, b)
+    assert cache.hits == 2
+    cache.score(a, c)
+    assert calls[-1] == (1, 3)
+
+def test_matching_scores_uncached():
+    # The popcount score() is cheaper than a lookup (benchmarks/score_cache.py)
+    pytest.importorskip("streamlit")
+    import matching
+    assert matching.get_score_cache().maxsize == 0
+    assert matching.cached_score() is matching.score
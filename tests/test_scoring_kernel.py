@@ -0,0 +1,92 @@
+import random
+import threading
+
+import pytest
+
+from benchmarks.legacy import load_functions
+from benchmarks.synthetic import GRADES, LANGUAGES, SUBJECTS, TIME_SLOTS, TOPICS
+from scoring_kernel import ScoringKernel, CompiledPool, get_kernel
+from subject_masks import encode_subjects
+
+CASES = 3000
+
+def legacy_scorers():
+    matching, = load_functions("matching.py", "score")
+    app6, = load_functions("app6.py", "calculate_match_score")
+    app4, = load_functions("app4.py", "calculate_match_score")
+    app5, = load_functions("app5.py", "calculate_match_score")
+    app2, = load_functions("app2.py", "calculate_match_score")
+    app, = load_functions("app.py", "calculate_match_score")
+    sahay = load_functions("sahay.py", "calculate_match_score", "profile_tokens", "parse_grade")[0]
+    return {
+        "matching": matching,
+        "app6": lambda a, b: app6(a, b)[0],
+        "app4": lambda a, b: app4(a, b)[0],
+        "app5": lambda a, b: app5(a, b)[0],
+        "app2": lambda a, b: app2(a, b)[0],
+        "app": app,
+        "sahay": sahay,
+    }
+
+LEGACY = legacy_scorers()
+
+def random_profile(rng):
+    """A profile with every field any variant reads, including messy and missing values."""
+    subjects = SUBJECTS + ["Biology", ""]
+    languages = LANGUAGES + ["Urdu"]
+    pick = lambda: rng.sample(subjects, rng.randint(0, 3))
+    u = {
+        "user_id": rng.randint(1, 10**6),
+        "name": f"u{rng.randint(1, 50)}",
+        "time": rng.choice(TIME_SLOTS),
+        "grade": rng.choice(GRADES + ["Grade", "7", "Grade x", "Grade 12"]),
+    }
+    for key in ("strong_subjects", "weak_subjects", "teaches"):
+        if rng.random() < 0.8:
+            u[key] = pick()
+    if rng.random() < 0.9:
+        u["role"] = rng.choice(["Student", "Teacher", "Mentor"])
+    u["strong_mask"] = encode_subjects(u.get("teaches") or u.get("strong_subjects") or [])
+    u["weak_mask"] = encode_subjects(u.get("weak_subjects") or [])
+    u["languages"] = rng.choice([None, "", " , ", ",".join(rng.sample(languages, rng.randint(1, 3))),
+                                 " Hindi , English"])
+    u["subjects"] = rng.choice([None, "", ", ".join(pick()), " Science ,Mathematics "])
+    u["specific_topics"] = rng.choice(TOPICS + [None, "ALGEBRA", "alg", "Linear Algebra", "al", "Al", "a"])
+    return u
+
+@pytest.mark.parametrize("variant", sorted(LEGACY))
+def test_kernel_matches_legacy_scorer(variant):
+    rng = random.Random(variant)
+    ref, kernel = LEGACY[variant], ScoringKernel(variant)
+    for _ in range(CASES):
+        a, b = random_profile(rng), random_profile(rng)
+        assert kernel.score(kernel.compile(a), kernel.compile(b)) == ref(a, b), (a, b)
+
+@pytest.mark.parametrize("variant", ["app4", "app6"])
+def test_compiled_pool_picks_what_the_legacy_loop_picked(variant):
+    rng = random.Random(1)
+    ref = LEGACY[variant]
+    for _ in range(200):
+        mentors = [random_profile(rng) for _ in range(rng.randint(0, 30))]
+        me = random_profile(rng)
+        best, high = None, -1
+        for m in mentors:
+            if m["name"] == me["name"]: continue
+            s = ref(me, m)
+            if s > high: best, high = m, s
+        assert CompiledPool(variant, mentors).best(me, exclude_name=me["name"]) == (best, high)
+
+def test_get_kernel_builds_one_kernel_under_concurrency(monkeypatch):
+    import scoring_kernel
+    monkeypatch.setattr(scoring_kernel, "_kernels", {})
+    seen = []
+    start = threading.Barrier(16)
+
+    def worker():
+        start.wait()
+        seen.append(get_kernel("app4"))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len({id(k) for k in seen}) == 1
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+pytest.importorskip("streamlit")
+from shared_pool import SharedProfilePool
+
+def profile(name):
+    return {"name": name, "role": "Teacher", "grade": "Grade 5", "time": "4-5 PM", "teaches": ["Mathematics"]}
+
+def names(pool):
+    return sorted(p["name"] for p in pool.mentors())
+
+def test_match_removes_both_sides():
+    pool = SharedProfilePool()
+    for n in ("asha", "ravi", "meera"):
+        pool.register(profile(n), mentor=True, mentee=True)
+    assert len(pool.mentor_pool()) == 3
+    pool.remove("asha", "ravi")
+    assert names(pool) == ["meera"] and not [p for p in pool.mentees() if p["name"] != "meera"]
+    assert len(pool.mentor_pool()) == 1 and len(pool) == 1
+
+def test_remove_unknown_name_is_harmless():
+    pool = SharedProfilePool()
+    pool.register(profile("asha"), mentor=True)
+    pool.remove("nobody")
+    assert names(pool) == ["asha"]
+
+def test_old_profiles_expire_on_register():
+    pool = SharedProfilePool()
+    pool.register(profile("asha"), mentor=True)
+    pool._added["asha"] = time.time() - 2 * 60 * 60
+    assert names(pool) == ["asha"]
+    pool.register(profile("ravi"), mentor=True)
+    assert names(pool) == ["ravi"]
+    assert pool.expire(max_age=-1) == 1 and len(pool) == 0
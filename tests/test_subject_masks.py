@@ -0,0 +1,23 @@
+import logging
+
+from subject_masks import (encode_subjects, encode_languages, storable,
+                           SUBJECTS, LANGUAGES, SUBJECT_BITS, LANGUAGE_BITS)
+
+def test_every_form_option_has_a_bit():
+    assert encode_subjects(SUBJECTS) == (1 << len(SUBJECTS)) - 1
+    assert encode_languages(LANGUAGES) == (1 << len(LANGUAGES)) - 1
+    # Persisted bit positions never move
+    assert SUBJECT_BITS["Mathematics"] == 1 and SUBJECT_BITS["Chemistry"] == 1 << 5
+    assert LANGUAGE_BITS["English"] == 1 and LANGUAGE_BITS["Telugu"] == 1 << 5
+
+def test_unknown_values_are_logged_not_silently_dropped(caplog):
+    with caplog.at_level(logging.WARNING, logger="subject_masks"):
+        assert encode_subjects(" Astronomy , Mathematics") == SUBJECT_BITS["Mathematics"]
+    assert "Astronomy" in caplog.text
+
+def test_extended_masks_match_each_other_but_are_not_storable():
+    a = encode_languages("Urdu, Hindi", extend=True)
+    b = encode_languages(["Urdu"], extend=True)
+    assert a & b and not a & LANGUAGE_BITS["English"]
+    assert not storable(a)
+    assert storable(encode_languages("Hindi", extend=True))
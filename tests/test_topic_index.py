@@ -0,0 +1,50 @@
+import itertools
+
+from topic_index import TopicIndex, topic_terms, topic_overlap, topic_points
+
+TOPICS = ["algebra", "Linear Algebra", "linear  algebra", "thermodynamics", "thermodynamic laws",
+          "organic chemistry", "al", "Al", "a", "gebr", "", None]
+
+def test_similar_matches_pairwise_overlap():
+    index = TopicIndex()
+    for i, t in enumerate(TOPICS):
+        index.add(i, t)
+    for query in TOPICS:
+        expected = {}
+        for i, t in enumerate(TOPICS):
+            overlap = topic_overlap(topic_terms(query), topic_terms(t))
+            if topic_points(25, overlap):
+                expected[i] = overlap
+        got = {k: v for k, v in index.similar(query).items() if topic_points(25, v)}
+        assert got == expected, query
+
+def test_half_credit_rounds_up():
+    assert topic_points(25, (1, 2)) == 13
+    assert topic_points(25, (2, 4)) == 13
+    assert topic_points(25, (1, 3)) == 0
+    assert topic_points(25, (3, 3)) == 25
+    assert topic_points(25, (0, 1)) == 0
+
+def test_short_topics_use_substring_rule():
+    assert topic_points(25, topic_overlap(topic_terms("al"), topic_terms("Algebra"))) == 25
+    assert topic_points(25, topic_overlap(topic_terms("xy"), topic_terms("Algebra"))) == 0
+
+def test_remove_and_expire_bound_the_index():
+    index = TopicIndex()
+    for i, t in enumerate(TOPICS):
+        index.add(i, t)
+    index.remove(0)
+    index.remove(6)
+    assert 0 not in index and 6 not in index
+    assert 0 not in index.similar("algebra")
+    assert 6 not in index.similar("al")
+    assert index.expire(3600) == 0
+    assert index.expire(-1) == len(TOPICS) - 2
+    assert len(index) == 0 and not index.postings and not index.short
+
+def test_readding_a_key_replaces_its_topic():
+    index = TopicIndex()
+    index.add("u", "algebra")
+    index.add("u", "thermodynamics")
+    assert "u" not in index.similar("algebra")
+    assert set(itertools.chain.from_iterable(index.postings.values())) == {"u"}
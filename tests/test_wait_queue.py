@@ -0,0 +1,34 @@
+import pytest
+
+from wait_queue import AgingQueue, wait_minutes, AGING_POINTS_PER_MIN
+
+def test_now_zero_is_not_replaced_by_the_clock():
+    assert wait_minutes({"waiting_since": -600}, now=0) == 10
+    q = AgingQueue()
+    q.push("a", -600)
+    assert q.priority("a", now=0) == 10 * AGING_POINTS_PER_MIN
+
+def test_missing_or_none_waiting_since_has_waited_zero():
+    assert wait_minutes({}, now=1000) == 0
+    assert wait_minutes({"waiting_since": None}, now=1000) == 0
+
+def test_push_and_reprioritize_take_since_then_base():
+    q = AgingQueue()
+    q.push("a", 0, 0.0)
+    q.push("b", 60, 0.0)
+    assert q.peek() == "a"
+    q.reprioritize("b", 60, 5.0)   # b: 5 points ahead beats a's one-minute head start
+    assert q.peek() == "b"
+    q.push("b", 120, 0.0)          # pushing a present key moves it the same way
+    assert q.peek() == "a"
+    q.reprioritize("a", since=600)  # base kept
+    assert q.peek() == "b"
+
+def test_pair_by_wait_handles_none_waiting_since():
+    pytest.importorskip("streamlit")
+    from batch_matching import pair_by_wait
+    users = [{"user_id": i, "grade": "Grade 5", "time": "4-5 PM", "waiting_since": since,
+              "strong_mask": strong, "weak_mask": weak}
+             for i, (since, strong, weak) in enumerate([(None, 1, 2), (0, 2, 1), (None, 4, 8), (60, 8, 4)])]
+    pairs = pair_by_wait(users, now=0)
+    assert sorted(tuple(sorted(p[:2])) for p in pairs) == [(0, 1), (2, 3)]
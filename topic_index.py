@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import Counter, defaultdict
+
+# =========================================================
+# TOPIC TRIGRAMS
+# =========================================================
+# Topics are compared as sets of character trigrams. Similarity is the
+# overlap coefficient |A & B| / min(|A|, |B|), so a topic contained in
+# another ("algebra" / "linear algebra") scores 1.0 like the old substring
+# rule, while near misses ("thermodynamic" / "thermodynamics laws") get
+# partial credit instead of nothing. Topics under 3 characters have no
+# trigrams and keep the old rule: full credit when one contains the other.
+TOPIC_MIN_SIMILARITY = 0.5
+SHORT_TOPIC = 3
+
+def topic_grams(text):
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+def topic_terms(text):
+    """(normalized text, trigrams) of a topic, computed once per profile."""
+    t = " ".join((text or "").lower().split())
+    return t, topic_grams(t)
+
+def topic_overlap(a, b):
+    """(shared, smaller) for two topic_terms(); similarity is shared / smaller."""
+    (ta, ga), (tb, gb) = a, b
+    if not ta or not tb:
+        return 0, 1
+    if len(ta) < SHORT_TOPIC or len(tb) < SHORT_TOPIC:
+        return (1 if ta in tb or tb in ta else 0), 1
+    return len(ga & gb), min(len(ga), len(gb))
+
+def topic_points(weight, overlap):
+    """weight * similarity rounded half up, in integers; 0 below TOPIC_MIN_SIMILARITY."""
+    shared, smaller = overlap
+    if shared < TOPIC_MIN_SIMILARITY * smaller:
+        return 0
+    return (2 * weight * shared + smaller) // (2 * smaller)
+
+# =========================================================
+# TOPIC INDEX
+# =========================================================
+class TopicIndex:
+    """
+    Trigram -> keys inverted index over the waiting users' topics. Entries
+    are added when a profile is saved and removed on match or delete;
+    expire() drops anything older than the profile TTL, so users matched
+    or deleted by another process don't stay forever.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.terms = {}
+        self.added = {}
+        self.postings = defaultdict(set)
+        self.short = {}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, key):
+        return key in self.terms
+
+    def add(self, key, topic):
+        terms = topic_terms(topic)
+        with self._lock:
+            if self.terms.get(key) != terms:
+                self._remove(key)
+                self.terms[key] = terms
+                if terms[0] and len(terms[0]) < SHORT_TOPIC: self.short[key] = terms[0]
+                for g in terms[1]:
+                    self.postings[g].add(key)
+            self.added[key] = time.time()
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        _, grams = self.terms.pop(key, ("", ()))
+        self.added.pop(key, None)
+        self.short.pop(key, None)
+        for g in grams:
+            self.postings[g].discard(key)
+            if not self.postings[g]: del self.postings[g]
+
+    def expire(self, max_age):
+        """Drop entries added more than `max_age` seconds ago; returns how many."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            old = [k for k, t in self.added.items() if t < cutoff]
+            for k in old:
+                self._remove(k)
+        return len(old)
+
+    def similar(self, topic, min_similarity=TOPIC_MIN_SIMILARITY):
+        """{key: (shared, smaller)} for every indexed topic at or above min_similarity."""
+        text, grams = topic_terms(topic)
+        if not text:
+            return {}
+        with self._lock:
+            if len(text) < SHORT_TOPIC:
+                # No trigrams to look up: substring test against every entry
+                return {k: (1, 1) for k, t in self.terms.items() if t[0] and (text in t[0] or t[0] in text)}
+            shared = Counter()
+            for g in grams:
+                shared.update(self.postings.get(g, ()))
+            out = {}
+            for key, n in shared.items():
+                smaller = min(len(grams), len(self.terms[key][1]))
+                if n >= min_similarity * smaller:
+                    out[key] = (n, smaller)
+            for key, t in self.short.items():
+                if t in text: out[key] = (1, 1)
+            return out
@@ -0,0 +1,43 @@
+import logging
+import time
+from background import BackgroundLoop
+
+log = logging.getLogger(__name__)
+
+# Seconds between sweeps, and rows deleted per batch within a sweep
+SWEEP_INTERVAL = 300
+SWEEP_BATCH = 500
+
+# =========================================================
+# TTL SWEEPER
+# =========================================================
+class TTLSweeper(BackgroundLoop):
+    """
+    Background expiry on a fixed interval, so request paths never pay for
+    housekeeping. `delete_batch(limit)` removes up to `limit` expired rows
+    and returns how many it removed; a sweep repeats it until a batch comes
+    back short. Every sweep logs and records rows deleted and time taken.
+    """
+
+    run_at_start = True
+
+    def __init__(self, delete_batch, interval=SWEEP_INTERVAL, batch=SWEEP_BATCH, name="sweeper"):
+        super().__init__(interval, name)
+        self.delete_batch = delete_batch
+        self.batch = batch
+        self.runs = self.total_deleted = 0
+        self.last_deleted, self.last_seconds = 0, 0.0
+
+    def run_once(self):
+        start = time.perf_counter()
+        deleted = 0
+        while True:
+            n = self.delete_batch(self.batch)
+            deleted += n
+            if n < self.batch: break
+        elapsed = time.perf_counter() - start
+        self.runs += 1
+        self.total_deleted += deleted
+        self.last_deleted, self.last_seconds = deleted, elapsed
+        log.info("%s deleted %d expired rows in %.2fs", self.name, deleted, elapsed)
+        return deleted, elapsed
@@ -0,0 +1,121 @@
+import time
+
+# Priority points a waiting user gains per minute in the pool
+AGING_POINTS_PER_MIN = 1.0
+
+# =========================================================
+# AGING PRIORITY
+# =========================================================
+# priority(t) = base + AGING_POINTS_PER_MIN * minutes(t - since). Everyone
+# ages at the same rate, so the order never changes with t and the heap key
+# can be fixed at insert time: AGING_POINTS_PER_MIN * since / 60 - base
+# (smaller = served first). `since` is a unix timestamp in seconds.
+def waiting_since(user, now):
+    """The user's waiting_since, or `now` (no wait yet) when it is missing or None."""
+    since = user.get("waiting_since")
+    return now if since is None else since
+
+def wait_minutes(user, now=None):
+    if now is None: now = time.time()
+    return max(0.0, (now - waiting_since(user, now)) / 60)
+
+def wait_boost(user, now=None):
+    """Score points added for time spent waiting (ranking only, not the threshold)."""
+    return AGING_POINTS_PER_MIN * wait_minutes(user, now)
+
+def percentiles(values, qs=(50, 90, 99)):
+    """{q: value} nearest-rank percentiles, 0.0 for an empty list."""
+    values = sorted(values)
+    if not values:
+        return {q: 0.0 for q in qs}
+    return {q: values[min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))] for q in qs}
+
+# =========================================================
+# INDEXED HEAP
+# =========================================================
+class AgingQueue:
+    """
+    Binary min-heap of waiting users by aging priority, with a position map
+    so push, remove and reprioritize are all O(log n). Ties go to whoever
+    was pushed first.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._pos = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def _entry(self, since, base):
+        return AGING_POINTS_PER_MIN * since / 60 - base
+
+    def push(self, key, since, base=0.0):
+        """Add `key` (or move it, if present) with waiting_since `since`."""
+        if key in self._pos:
+            return self.reprioritize(key, since, base)
+        self._heap.append([self._entry(since, base), self._seq, key, since, base])
+        self._seq += 1
+        self._pos[key] = len(self._heap) - 1
+        self._up(len(self._heap) - 1)
+
+    def reprioritize(self, key, since=None, base=None):
+        """Move `key` to a new waiting_since and/or base; None keeps the current one."""
+        i = self._pos[key]
+        item = self._heap[i]
+        if since is not None: item[3] = since
+        if base is not None: item[4] = base
+        old, item[0] = item[0], self._entry(item[3], item[4])
+        if item[0] < old: self._up(i)
+        else: self._down(i)
+
+    def remove(self, key):
+        i = self._pos.pop(key, None)
+        if i is None:
+            return
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[2]] = i
+            self._up(i)
+            self._down(self._pos[last[2]])
+
+    def peek(self):
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self):
+        key = self.peek()
+        if key is not None: self.remove(key)
+        return key
+
+    def priority(self, key, now=None):
+        _, _, _, since, base = self._heap[self._pos[key]]
+        if now is None: now = time.time()
+        return base + AGING_POINTS_PER_MIN * max(0.0, now - since) / 60
+
+    def _swap(self, i, j):
+        h = self._heap
+        h[i], h[j] = h[j], h[i]
+        self._pos[h[i][2]], self._pos[h[j][2]] = i, j
+
+    def _up(self, i):
+        h = self._heap
+        while i:
+            parent = (i - 1) // 2
+            if h[i][:2] >= h[parent][:2]: break
+            self._swap(i, parent)
+            i = parent
+
+    def _down(self, i):
+        h, n = self._heap, len(self._heap)
+        while True:
+            small = i
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < n and h[c][:2] < h[small][:2]: small = c
+            if small == i: break
+            self._swap(i, small)
+            i = small